@@ -1,5 +1,7 @@
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import google.cloud.logging
 
 # IMPORTANT: This needs to be the first thing to run to set up logging.
@@ -14,38 +16,217 @@ else:
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
-from flask import Flask, request, jsonify, render_template
+# Request threads only enqueue log records; one background thread does the I/O.
+from src import log_pipeline
+log_pipeline.install_queue_logging(project=client.project if "K_SERVICE" in os.environ else None)
+
+from flask import Flask, request, jsonify, render_template, abort, send_file
 from dotenv import load_dotenv
 
 from src import manager
-from src.manage_firestore_state import get_current_round_pointer, get_round_data_by_path
+from src import live_standings
+from src import season_archive
+from src import record_matchday
+from src import snapshot_store
+from src import circuit_breaker
+from src import current_round_cache
+from src import profiling
+from src import team_logos
+from src import freshness
+from src import tick_deadline
 
 load_dotenv()
+record_matchday.install_from_env()
+snapshot_store.install_from_env()
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
+# "public" serves only the read routes, "orchestrator" only /run, "all" both.
+# Deploying the image twice with different roles keeps ticks from ever
+# competing with page views for request threads.
+SERVICE_ROLE = os.getenv("SERVICE_ROLE", "all")
+PUBLIC_ENDPOINTS = {"serve_homepage", "get_current_round_data", "get_live_standings",
+                    "get_archived_round", "get_team_results", "get_team_logo", "static"}
+ORCHESTRATOR_ENDPOINTS = {"run_main_trigger"}
+
+# Ticks run one at a time on their own thread. /run waits for the tick's
+# result, which the tick budget bounds, and answers 2xx only when the tick
+# succeeded so Cloud Tasks retries every other outcome. A delivery arriving
+# while a tick is in flight is answered 409 at once: only one request thread
+# ever waits on a tick, and the task is retried after the tick is done.
+ORCHESTRATION_TIMEOUT_SECONDS = max(
+    tick_deadline.TICK_BUDGET_SECONDS,
+    float(os.getenv("ORCHESTRATION_TIMEOUT_SECONDS", tick_deadline.TICK_BUDGET_SECONDS + 15))
+)
+ORCHESTRATION_BUSY_RETRY_AFTER_SECONDS = 30
+_orchestration_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="orchestration")
+_orchestration_lock = threading.Lock()
+_orchestration_future = None
+
+@app.before_request
+def enforce_service_role():
+    if SERVICE_ROLE == "public" and request.endpoint in ORCHESTRATOR_ENDPOINTS:
+        abort(404)
+    if SERVICE_ROLE == "orchestrator" and request.endpoint in PUBLIC_ENDPOINTS:
+        abort(404)
+
 
 @app.route("/")
 def serve_homepage():
     return render_template('index.html')
 
+def _is_internal_request():
+    expected_key = os.getenv("INTERNAL_API_KEY")
+    return bool(expected_key) and request.headers.get("X-API-Key") == expected_key
+
+def _profile_requested():
+    # Per-request profiling is only honoured for callers holding the internal key.
+    return request.headers.get("X-Profile") == "1" and _is_internal_request()
+
+def _store_unavailable_response():
+    response = jsonify({"error": "Round data is temporarily unavailable."})
+    response.status_code = 503
+    retry_after = circuit_breaker.get_breaker(circuit_breaker.FIRESTORE).retry_after_seconds()
+    response.headers["Retry-After"] = str(max(1, int(retry_after)))
+    return response
+
 @app.route("/api/get_current_round")
 def get_current_round_data():
+    with profiling.maybe_profile("read", requested=_profile_requested()):
+        return _current_round_response()
+
+def _current_round_response():
     try:
-        pointer = get_current_round_pointer()
-        if not pointer or not pointer.get("document_path"):
-            logging.warning("API call made but no current round pointer is set.")
+        round_data, is_stale = current_round_cache.get_current_round()
+        if not round_data:
+            if circuit_breaker.is_open(circuit_breaker.FIRESTORE):
+                return _store_unavailable_response()
+            logging.warning("API call made but no current round data is available.")
             return jsonify({"error": "No current round data available."}), 404
 
-        round_data = get_round_data_by_path(pointer["document_path"])
+        freshness.record_round(freshness.SERVED, round_data)
+        return jsonify(dict(round_data, stale=is_stale))
+
+    except Exception as e:
+        logging.error("API Error fetching current round data: %s", e)
+        return jsonify({"error": "An internal error occurred."}), 500
+
+@app.route("/api/standings")
+def get_live_standings():
+    try:
+        standings = live_standings.get_cached_live_table()
+        if standings is None:
+            # This instance has not run a tick yet; the last tick stored the
+            # projected table alongside the round.
+            round_data, _ = current_round_cache.get_current_round()
+            standings = (round_data or {}).get("standings")
+
+        if not standings:
+            return jsonify({"error": "No standings available."}), 404
+
+        return jsonify({"standings": standings})
+
+    except Exception as e:
+        logging.error("API Error fetching live standings: %s", e)
+        return jsonify({"error": "An internal error occurred."}), 500
+
+# Archived rounds never change once every match is completed.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+TEAM_RESULTS_CACHE_CONTROL = "public, max-age=300"
+# Past seasons the history routes serve besides the configured one, e.g.
+# "2023,2024". Any other league or season is a 404 without touching Firestore.
+ARCHIVE_SEASONS = {s.strip() for s in os.getenv("ARCHIVE_SEASONS", "").split(",") if s.strip()}
+
+def _is_served_season(league_id, season):
+    return str(league_id) == str(manager.LEAGUE_ID) and str(season) in ARCHIVE_SEASONS | {str(manager.SEASON)}
+
+@app.route("/api/rounds/<round_id>")
+def get_archived_round(round_id):
+    league_id = request.args.get("league", manager.LEAGUE_ID)
+    season = request.args.get("season", manager.SEASON)
+    if not _is_served_season(league_id, season):
+        return jsonify({"error": f"No archived data for round '{round_id}'."}), 404
+    try:
+        round_data = season_archive.get_archived_round(league_id, season, round_id)
         if not round_data:
-            return jsonify({"error": "Could not retrieve round data."}), 404
+            return jsonify({"error": f"No archived data for round '{round_id}'."}), 404
 
-        return jsonify(round_data)
+        response = jsonify(round_data)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
 
     except Exception as e:
-        logging.error(f"API Error fetching current round data: {e}")
+        logging.error("API Error fetching archived round '%s': %s", round_id, e)
         return jsonify({"error": "An internal error occurred."}), 500
 
+@app.route("/api/teams/<team_name>/results")
+def get_team_results(team_name):
+    try:
+        limit = int(request.args.get("limit", 50))
+        if limit < 1:
+            raise ValueError(limit)
+        league_id = request.args.get("league", manager.LEAGUE_ID)
+        season = request.args.get("season")
+        if not _is_served_season(league_id, season or manager.SEASON):
+            return jsonify({"error": "No match history for that league and season."}), 404
+        # Without a season filter, the current season is the one that may
+        # have rounds this instance has not archived yet.
+        if not season_archive.ensure_season_synced(league_id, season or manager.SEASON):
+            return jsonify({"error": "Match history is temporarily unavailable."}), 503, {"Retry-After": "30"}
+
+        results = season_archive.get_team_results(
+            team_name, league_id=league_id, season=season, limit=min(limit, 500)
+        )
+        if results is None:
+            return jsonify({"error": "An internal error occurred."}), 500
+
+        response = jsonify({"team": team_name, "results": results})
+        response.headers["Cache-Control"] = TEAM_RESULTS_CACHE_CONTROL
+        return response
+
+    except ValueError:
+        return jsonify({"error": "Invalid limit."}), 400
+    except Exception as e:
+        logging.error("API Error fetching results for team '%s': %s", team_name, e)
+        return jsonify({"error": "An internal error occurred."}), 500
+
+@app.route("/internal/freshness")
+def get_freshness_report():
+    # Per-stage percentiles of the delay between a match change first being
+    # observed upstream and it being persisted, served and published, as seen
+    # by the instance answering this request only. Fleet-wide percentiles come
+    # from a log-based distribution metric on freshness_latency_seconds.
+    if not _is_internal_request():
+        return "Unauthorized", 401
+    return jsonify(freshness.report())
+
+def _run_orchestration(profile_requested):
+    with profiling.maybe_profile("run", requested=profile_requested):
+        return manager.run_orchestration_logic()
+
+@app.route("/static/logos/<team_id>")
+def get_team_logo(team_id):
+    try:
+        size = int(request.args.get("size", team_logos.DEFAULT_LOGO_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid size."}), 400
+
+    # Only crests of teams in the current round or standings are served, so
+    # arbitrary ids never reach the CDN or the disk cache.
+    round_data, _ = current_round_cache.get_current_round()
+    standings = live_standings.get_cached_live_table() or (round_data or {}).get("standings")
+    allowed_team_ids = team_logos.known_team_ids(round_data, standings)
+
+    logo = team_logos.get_logo(team_id, size=size, accept_webp="image/webp" in request.headers.get("Accept", ""),
+                               allowed_team_ids=allowed_team_ids)
+    if logo is None:
+        return jsonify({"error": f"No logo for team '{team_id}'."}), 404
+
+    path, mimetype = logo
+    response = send_file(os.path.abspath(path), mimetype=mimetype, conditional=True)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response.headers["Vary"] = "Accept"
+    return response
+
 @app.route("/run", methods=["POST"])
 def run_main_trigger():
     auth_header = request.headers.get("X-API-Key")
@@ -55,10 +236,22 @@ def run_main_trigger():
         logging.error("Unauthorized access attempt to /run endpoint.")
         return "Unauthorized", 401
 
-    logging.info("Authorized request received. Starting main logic.")
-    
-    success = manager.run_orchestration_logic()
-    
+    global _orchestration_future
+    with _orchestration_lock:
+        future = _orchestration_future
+        if future is not None and not future.done():
+            logging.warning("A tick is already in flight. Answering 409 so the task is retried later.")
+            return "Conflict", 409, {"Retry-After": str(ORCHESTRATION_BUSY_RETRY_AFTER_SECONDS)}
+        logging.info("Authorized request received. Starting main logic.")
+        future = _orchestration_executor.submit(_run_orchestration, _profile_requested())
+        _orchestration_future = future
+
+    try:
+        success = future.result(timeout=ORCHESTRATION_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        logging.error("Main logic still running after %ss. Failing /run so the task is retried.", ORCHESTRATION_TIMEOUT_SECONDS)
+        return "Error", 500
+
     if success:
         logging.info("Main logic completed successfully.")
         return "OK", 200
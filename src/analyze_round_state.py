@@ -3,6 +3,8 @@ import logging
 import json
 from datetime import datetime, timedelta, timezone
 
+from . import clock
+
 logger = logging.getLogger(__name__)
 
 # This is the same value from the manager, for consistency
@@ -33,13 +35,13 @@ def analyze_round_state(round_data):
         if "not_started" in statuses or "in_play" in statuses or "half_time" in statuses:
              round_state = "partially_completed"
         else:
-            logger.warning(f"Could not determine a clear round state from statuses: {statuses}")
-            next_run_timestamp = datetime.now(timezone.utc) + timedelta(minutes=5)
+            logger.warning("Could not determine a clear round state from statuses: %s", statuses)
+            next_run_timestamp = clock.utc_now() + timedelta(minutes=5)
             return {"round_state": round_state, "next_run_timestamp": next_run_timestamp.isoformat()}
     
-    logger.info(f"Determined overall round state as: {round_state}")
+    logger.info("Determined overall round state as: %s", round_state)
     
-    now = datetime.now(timezone.utc)
+    now = clock.utc_now()
     next_run_timestamp = None
 
     if round_state == "in_play":
@@ -60,7 +62,7 @@ def analyze_round_state(round_data):
         
         if next_match_timestamp:
             if next_match_timestamp < now:
-                logger.warning(f"Next match kickoff ({next_match_timestamp}) is in the past. API data may be lagging. Scheduling a check in 60 seconds.")
+                logger.warning("Next match kickoff (%s) is in the past. API data may be lagging. Scheduling a check in 60 seconds.", next_match_timestamp)
                 next_run_timestamp = now + timedelta(seconds=60)
             else:
                 # --- NEW LOGIC ---
@@ -85,7 +87,7 @@ def analyze_round_state(round_data):
         "next_run_timestamp": next_run_timestamp.isoformat() if next_run_timestamp else None
     }
     
-    logger.info(f"Analysis complete: {analysis}")
+    logger.info("Analysis complete: %s", analysis)
     return analysis
 
 if __name__ == "__main__":
@@ -99,10 +101,10 @@ if __name__ == "__main__":
             reverse=True
         )
         if not files:
-            logger.error(f"No 'prepared_round_state_*.json' files found in '{EXPORT_DIR}' for CLI test.")
+            logger.error("No 'prepared_round_state_*.json' files found in '%s' for CLI test.", EXPORT_DIR)
         else:
             latest_file = os.path.join(EXPORT_DIR, files[0])
-            logger.info(f"Running CLI test on latest consolidated file: {latest_file}")
+            logger.info("Running CLI test on latest consolidated file: %s", latest_file)
             with open(latest_file, 'r', encoding='utf-8') as f:
                 test_data = json.load(f)
             analysis_result = analyze_round_state(test_data)
@@ -114,6 +116,6 @@ if __name__ == "__main__":
             else:
                 logger.error("Analysis failed.")
     except FileNotFoundError:
-        logger.error(f"Export directory '{EXPORT_DIR}' not found.")
+        logger.error("Export directory '%s' not found.", EXPORT_DIR)
     except Exception as e:
-        logger.error(f"An error occurred during CLI test: {e}")
\ No newline at end of file
+        logger.error("An error occurred during CLI test: %s", e)
\ No newline at end of file
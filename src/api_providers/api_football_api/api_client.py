@@ -0,0 +1,115 @@
+import logging
+import requests
+import json
+
+from ... import circuit_breaker
+from ... import tick_deadline
+from .key_pool import get_key_pool
+from ...log_pipeline import HOT_PATH
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://v3.football.api-sports.io"
+API_HOST = "v3.football.api-sports.io"
+
+# Observers called as hook(endpoint, params, response_items) after every
+# successful request, e.g. the matchday recorder.
+_response_hooks = []
+# When set, replaces the HTTP call entirely: transport(endpoint, params) must
+# return the list of response items, or None on failure.
+_transport = None
+
+def add_response_hook(hook):
+    if hook not in _response_hooks:
+        _response_hooks.append(hook)
+
+def remove_response_hook(hook):
+    if hook in _response_hooks:
+        _response_hooks.remove(hook)
+
+def set_transport(transport):
+    global _transport
+    _transport = transport
+
+def _notify_hooks(endpoint, params, response_items):
+    for hook in list(_response_hooks):
+        try:
+            hook(endpoint, params, response_items)
+        except Exception as e:
+            logger.error("API Football response hook %s failed: %s", hook, e)
+
+def _http_request(endpoint, params):
+    key_pool = get_key_pool()
+    if key_pool is None:
+        logger.error("Neither API_FOOTBALL_API_KEYS nor API_FOOTBALL_API_KEY found in environment.")
+        return None
+
+    if tick_deadline.expired():
+        logger.warning("Tick budget spent. Skipping request to %s.", endpoint)
+        return None
+
+    breaker = circuit_breaker.get_breaker(circuit_breaker.API_FOOTBALL)
+    if not breaker.allow_request():
+        logger.warning("API Football circuit is open. Skipping request to %s.", endpoint)
+        return None
+
+    # Acquired last: acquiring spends one of the key's quota up front, which a
+    # request skipped by the checks above must not do.
+    api_key = key_pool.acquire()
+    if api_key is None:
+        breaker.cancel_request()
+        logger.warning("Every API Football key is out of quota until %s. Skipping request to %s.", key_pool.next_available_at(), endpoint)
+        return None
+
+    headers = {
+        "x-rapidapi-key": api_key,
+        "x-rapidapi-host": API_HOST
+    }
+
+    url = f"{BASE_URL}/{endpoint}"
+    logger.info("Requesting from API Football endpoint: %s with params: %s", endpoint, params, extra=HOT_PATH)
+
+    try:
+        response = requests.get(url, headers=headers, params=params, timeout=tick_deadline.timeout_for(20))
+        # Client errors mean the upstream is answering; only outages trip the breaker.
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        key_pool.record_response(api_key, response.status_code, response.headers)
+        response.raise_for_status()
+        response_data = response.json()
+
+        if response_data.get("errors"):
+            key_pool.record_errors(api_key, response_data["errors"])
+            logger.error("API returned errors: %s", response_data['errors'])
+            return None
+
+        if "response" not in response_data:
+            logger.error("API response is missing the 'response' key.")
+            return None
+
+        response_items = response_data["response"]
+        logger.info("Successfully received %s items from the API.", len(response_items), extra=HOT_PATH)
+        return response_items
+
+    except requests.exceptions.HTTPError as e:
+        logger.error("HTTP request to API Football failed: %s", e)
+        return None
+    except requests.exceptions.RequestException as e:
+        breaker.record_failure()
+        logger.error("HTTP request to API Football failed: %s", e)
+        return None
+    except json.JSONDecodeError:
+        logger.error("Failed to decode JSON from API Football response.")
+        return None
+
+def api_request(endpoint, params):
+    if _transport is not None:
+        response_items = _transport(endpoint, params)
+    else:
+        response_items = _http_request(endpoint, params)
+
+    if response_items is not None and _response_hooks:
+        _notify_hooks(endpoint, params, response_items)
+    return response_items
@@ -1,60 +1,19 @@
 import os
 import logging
-import requests
-import json
 
-logger = logging.getLogger(__name__)
-
-BASE_URL = "https://v3.football.api-sports.io"
-API_HOST = "v3.football.api-sports.io"
-
-def _api_request(endpoint, params):
-    api_key = os.environ.get("API_FOOTBALL_API_KEY")
-    if not api_key:
-        logger.error("API_FOOTBALL_API_KEY not found in environment.")
-        return None
-
-    headers = {
-        "x-rapidapi-key": api_key,
-        "x-rapidapi-host": API_HOST
-    }
-    
-    url = f"{BASE_URL}/{endpoint}"
-    logger.info(f"Requesting from API Football endpoint: {endpoint} with params: {params}")
-
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=20)
-        response.raise_for_status()
-        response_data = response.json()
+from .api_client import api_request
 
-        if response_data.get("errors"):
-            logger.error(f"API returned errors: {response_data['errors']}")
-            return None
-        
-        if "response" not in response_data:
-            logger.error("API response is missing the 'response' key.")
-            return None
-        
-        response_items = response_data["response"]
-        logger.info(f"Successfully received {len(response_items)} items from the API.")
-        return response_items
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"HTTP request to API Football failed: {e}")
-        return None
-    except json.JSONDecodeError:
-        logger.error("Failed to decode JSON from API Football response.")
-        return None
+logger = logging.getLogger(__name__)
 
 def discover_current_round_from_api(league, season):
-    logger.info(f"Discovering current round for league {league}, season {season}.")
+    logger.info("Discovering current round for league %s, season %s.", league, season)
     params = {"league": league, "season": season, "current": "true"}
     
-    rounds = _api_request("fixtures/rounds", params)
+    rounds = api_request("fixtures/rounds", params)
 
     if rounds and isinstance(rounds, list) and len(rounds) > 0:
         current_round = rounds[0]
-        logger.info(f"Successfully discovered current round: {current_round}")
+        logger.info("Successfully discovered current round: %s", current_round)
         return current_round
     
     logger.warning("Could not discover a current round. API returned no data. Potentially end of season.")
@@ -0,0 +1,31 @@
+import os
+import logging
+
+from .api_client import api_request
+
+logger = logging.getLogger(__name__)
+
+def fetch_fixture_events_from_api(fixture):
+    logger.info("Fetching events for fixture %s.", fixture)
+    params = {"fixture": fixture}
+    return api_request("fixtures/events", params)
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    FIXTURE_ID_TO_TEST = os.getenv("API_FOOTBALL_FIXTURE_ID")
+
+    if not FIXTURE_ID_TO_TEST:
+        logger.critical("API_FOOTBALL_FIXTURE_ID not set in .env file. Aborting test.")
+    else:
+        events_data = fetch_fixture_events_from_api(fixture=FIXTURE_ID_TO_TEST)
+
+        if events_data is not None:
+            from ... import snapshot_store
+            sha = snapshot_store.put(snapshot_store.API, events_data, key="fixtures/events", params={"fixture": FIXTURE_ID_TO_TEST})
+            if sha:
+                logger.info("Stored %s events as snapshot %s in %s", len(events_data), sha[:12], snapshot_store.SNAPSHOT_DIR)
+        else:
+            logger.error("Failed to fetch fixture events from API-Football, no snapshot stored.")
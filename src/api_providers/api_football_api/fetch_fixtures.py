@@ -1,55 +1,13 @@
 import os
 import logging
-import requests
-import json
-from datetime import datetime
 
-logger = logging.getLogger(__name__)
-
-BASE_URL = "https://v3.football.api-sports.io"
-API_HOST = "v3.football.api-sports.io"
-
-def _api_request(endpoint, params):
-    api_key = os.environ.get("API_FOOTBALL_API_KEY")
-    if not api_key:
-        logger.error("API_FOOTBALL_API_KEY not found in environment.")
-        return None
-
-    headers = {
-        "x-rapidapi-key": api_key,
-        "x-rapidapi-host": API_HOST
-    }
-    
-    url = f"{BASE_URL}/{endpoint}"
-    logger.info(f"Requesting from API Football endpoint: {endpoint} with params: {params}")
-
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=20)
-        response.raise_for_status()
-        response_data = response.json()
+from .api_client import api_request
 
-        if response_data.get("errors"):
-            logger.error(f"API returned errors: {response_data['errors']}")
-            return None
-        
-        if "response" not in response_data:
-            logger.error("API response is missing the 'response' key.")
-            return None
-        
-        response_items = response_data["response"]
-        logger.info(f"Successfully received {len(response_items)} items from the API.")
-        return response_items
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"HTTP request to API Football failed: {e}")
-        return None
-    except json.JSONDecodeError:
-        logger.error("Failed to decode JSON from API Football response.")
-        return None
+logger = logging.getLogger(__name__)
 
 def fetch_fixtures_from_api(league=None, season=None, round=None, date=None, timezone=None):
     params = {key: val for key, val in locals().items() if val is not None}
-    return _api_request("fixtures", params)
+    return api_request("fixtures", params)
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -67,7 +25,7 @@ if __name__ == "__main__":
     if not LEAGUE_ID_TO_TEST or not SEASON_TO_TEST:
         logger.critical("API_FOOTBALL_LEAGUE_ID and/or API_FOOTBALL_SEASON not set in .env file. Aborting test.")
     else:
-        logger.info(f"CLI Test: Fetching fixtures for League {LEAGUE_ID_TO_TEST}, Season {SEASON_TO_TEST}, Round '{ROUND_TO_TEST}'")
+        logger.info("CLI Test: Fetching fixtures for League %s, Season %s, Round '%s'", LEAGUE_ID_TO_TEST, SEASON_TO_TEST, ROUND_TO_TEST)
 
         fixtures_data = fetch_fixtures_from_api(
             league=LEAGUE_ID_TO_TEST,
@@ -77,18 +35,10 @@ if __name__ == "__main__":
         )
 
         if fixtures_data is not None:
-            output_dir = "exports"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_round = "".join(c for c in ROUND_TO_TEST if c.isalnum())
-            filename = f"{output_dir}/api_football_fixtures_{LEAGUE_ID_TO_TEST}_{safe_round}_{timestamp}.json"
-            
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(fixtures_data, f, indent=4, ensure_ascii=False)
-                logger.info(f"Successfully saved {len(fixtures_data)} fixtures to {filename}")
-            except IOError as e:
-                logger.error(f"Failed to write to file {filename}: {e}")
+            from ... import snapshot_store
+            params = {"league": LEAGUE_ID_TO_TEST, "season": SEASON_TO_TEST, "round": ROUND_TO_TEST, "timezone": TIMEZONE_TO_TEST}
+            sha = snapshot_store.put(snapshot_store.API, fixtures_data, key="fixtures", params=params)
+            if sha:
+                logger.info("Stored %s fixtures as snapshot %s in %s", len(fixtures_data), sha[:12], snapshot_store.SNAPSHOT_DIR)
         else:
-            logger.error("Failed to fetch fixtures from API-Football, no output file generated.")
\ No newline at end of file
+            logger.error("Failed to fetch fixtures from API-Football, no snapshot stored.")
\ No newline at end of file
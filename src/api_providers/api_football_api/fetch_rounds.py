@@ -0,0 +1,28 @@
+import os
+import logging
+
+from .api_client import api_request
+
+logger = logging.getLogger(__name__)
+
+def fetch_rounds_from_api(league, season):
+    logger.info("Fetching all rounds for league %s, season %s.", league, season)
+    params = {"league": league, "season": season}
+    return api_request("fixtures/rounds", params)
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    LEAGUE_ID_TO_TEST = os.getenv("API_FOOTBALL_LEAGUE_ID")
+    SEASON_TO_TEST = os.getenv("API_FOOTBALL_SEASON")
+
+    if not LEAGUE_ID_TO_TEST or not SEASON_TO_TEST:
+        logger.critical("API_FOOTBALL_LEAGUE_ID and/or API_FOOTBALL_SEASON not set in .env file. Aborting test.")
+    else:
+        rounds = fetch_rounds_from_api(league=LEAGUE_ID_TO_TEST, season=SEASON_TO_TEST)
+        if rounds is not None:
+            print(f"\nCLI Test Success: {len(rounds)} rounds -> {rounds}\n")
+        else:
+            print("\nCLI Test Failed: Could not fetch rounds.\n")
@@ -0,0 +1,152 @@
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from ... import clock
+
+logger = logging.getLogger(__name__)
+
+# API-Football reports the daily quota on every response, plus a per-minute
+# limit. The daily counter resets at midnight UTC.
+DAILY_REMAINING_HEADER = "x-ratelimit-requests-remaining"
+DAILY_LIMIT_HEADER = "x-ratelimit-requests-limit"
+MINUTE_REMAINING_HEADER = "X-RateLimit-Remaining"
+# A key that hit its per-minute limit is rested for this long.
+MINUTE_PAUSE_SECONDS = 60
+
+class _KeyState:
+    def __init__(self, key):
+        self.key = key
+        self.daily_remaining = None
+        self.daily_limit = None
+        self.minute_remaining = None
+        self.paused_until = None
+
+    @property
+    def label(self):
+        # Never log a full key.
+        return f"...{self.key[-4:]}"
+
+    def headroom(self):
+        # Keys with per-minute capacity left come first, then by daily quota.
+        # Unknown quota (no response seen yet) ranks highest, so fresh keys
+        # are probed before the pool leans on keys it knows to be running low.
+        has_minute_capacity = self.minute_remaining is None or self.minute_remaining > 0
+        daily = float("inf") if self.daily_remaining is None else self.daily_remaining
+        return has_minute_capacity, daily
+
+def _next_daily_reset(now):
+    midnight = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    return midnight + timedelta(days=1)
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class KeyPool:
+    # Routes each request to the key with the most daily quota left and pauses
+    # keys that run out: until midnight UTC for the daily quota, for a minute
+    # for the per-minute limit. Capacity grows with every key added.
+    def __init__(self, keys):
+        self._lock = threading.Lock()
+        self._states = [_KeyState(key) for key in dict.fromkeys(keys)]
+
+    def __len__(self):
+        return len(self._states)
+
+    def acquire(self):
+        # Returns the key to use for the next request, or None while every key
+        # is paused. The chosen key's counters are decremented up front, so
+        # concurrent requests spread across the pool instead of piling onto
+        # the same key before its response headers arrive.
+        now = clock.utc_now()
+        with self._lock:
+            available = [s for s in self._states if s.paused_until is None or s.paused_until <= now]
+            if not available:
+                return None
+            state = max(available, key=_KeyState.headroom)
+            state.paused_until = None
+            if state.daily_remaining is not None:
+                state.daily_remaining -= 1
+            if state.minute_remaining is not None:
+                state.minute_remaining -= 1
+            return state.key
+
+    def _state_for(self, key):
+        return next((s for s in self._states if s.key == key), None)
+
+    def _pause(self, state, until, reason):
+        if state.paused_until is None or until > state.paused_until:
+            state.paused_until = until
+            logger.warning("API Football key %s %s. Pausing it until %s.", state.label, reason, until.isoformat())
+
+    def record_response(self, key, status_code, headers):
+        # Updates the key's quota from the response headers and pauses it if it
+        # is exhausted.
+        now = clock.utc_now()
+        with self._lock:
+            state = self._state_for(key)
+            if state is None:
+                return
+            daily_remaining = _to_int(headers.get(DAILY_REMAINING_HEADER))
+            if daily_remaining is not None:
+                state.daily_remaining = daily_remaining
+                state.daily_limit = _to_int(headers.get(DAILY_LIMIT_HEADER)) or state.daily_limit
+            minute_remaining = _to_int(headers.get(MINUTE_REMAINING_HEADER))
+            if minute_remaining is not None:
+                state.minute_remaining = minute_remaining
+
+            if state.daily_remaining is not None and state.daily_remaining <= 0:
+                self._pause(state, _next_daily_reset(now), "has used its daily quota")
+            elif status_code == 429 or (state.minute_remaining is not None and state.minute_remaining <= 0):
+                self._pause(state, now + timedelta(seconds=MINUTE_PAUSE_SECONDS), "hit its per-minute limit")
+
+    def record_errors(self, key, errors):
+        # API-Football also reports quota exhaustion in the body's "errors"
+        # field, with a 200 status.
+        if not isinstance(errors, dict):
+            return
+        now = clock.utc_now()
+        with self._lock:
+            state = self._state_for(key)
+            if state is None:
+                return
+            if "requests" in errors:
+                state.daily_remaining = 0
+                self._pause(state, _next_daily_reset(now), "has used its daily quota")
+            elif "rateLimit" in errors:
+                self._pause(state, now + timedelta(seconds=MINUTE_PAUSE_SECONDS), "hit its per-minute limit")
+
+    def next_available_at(self):
+        with self._lock:
+            paused = [s.paused_until for s in self._states if s.paused_until is not None]
+            if len(paused) < len(self._states):
+                return clock.utc_now()
+            return min(paused) if paused else None
+
+def keys_from_env():
+    # API_FOOTBALL_API_KEYS is a comma-separated pool; a lone
+    # API_FOOTBALL_API_KEY keeps working as a pool of one.
+    keys = [k.strip() for k in os.environ.get("API_FOOTBALL_API_KEYS", "").split(",") if k.strip()]
+    single_key = os.environ.get("API_FOOTBALL_API_KEY")
+    if single_key and single_key.strip() not in keys:
+        keys.append(single_key.strip())
+    return keys
+
+_pool_lock = threading.Lock()
+_pool = None
+
+def get_key_pool():
+    # Built on first use, after dotenv has populated the environment.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            keys = keys_from_env()
+            if not keys:
+                return None
+            _pool = KeyPool(keys)
+            logger.info("API Football key pool holds %s key(s).", len(_pool))
+        return _pool
@@ -0,0 +1,146 @@
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import clock
+from . import manage_firestore_state
+from .rate_limiter import TokenBucket
+from .prepare_current_round_state import build_round_state
+from .api_providers.api_football_api.fetch_rounds import fetch_rounds_from_api
+from .api_providers.api_football_api.fetch_fixtures import fetch_fixtures_from_api
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_REQUESTS_PER_MINUTE = float(os.getenv("BACKFILL_REQUESTS_PER_MINUTE", "30"))
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", "4"))
+# Rounds are committed (and the checkpoint advanced) in groups of this many,
+# so an interrupted run loses at most one group's fetches.
+BACKFILL_COMMIT_EVERY_ROUNDS = 10
+CHECKPOINT_DIR = "exports"
+
+def checkpoint_path(league_id, season):
+    return os.path.join(CHECKPOINT_DIR, f"backfill_{league_id}_{season}.json")
+
+def load_checkpoint(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (IOError, json.JSONDecodeError) as e:
+        logger.error("Could not read backfill checkpoint %s: %s. Starting from scratch.", path, e)
+        return None
+
+def save_checkpoint(path, checkpoint):
+    checkpoint["updated_utc"] = clock.utc_now().isoformat()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    # Atomic swap, so a crash mid-write never leaves a corrupt checkpoint.
+    os.replace(tmp_path, path)
+
+def _round_doc_path(league_id, season, round_id):
+    return f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/rounds/{round_id}"
+
+def _fetch_round(bucket, league_id, season, round_id):
+    bucket.acquire()
+    fixtures = fetch_fixtures_from_api(league=league_id, season=season, round=round_id, timezone="UTC")
+    if fixtures is None:
+        return round_id, None
+    return round_id, build_round_state(round_id, fixtures)
+
+def _is_round_complete(round_data):
+    matches = round_data.get("matches") or []
+    return bool(matches) and all(m.get("status") == "completed" for m in matches)
+
+def _commit(pending, checkpoint, path):
+    # Merged, so fields only the tick maintains (standings, events) survive.
+    documents = {doc_path: data for doc_path, (_, data) in pending.items()}
+    written = manage_firestore_state.set_documents(documents, merge=True)
+    if written != len(documents):
+        return False
+    # Rounds with matches still to play are fetched again on the next run.
+    checkpoint["completed_rounds"].extend(
+        round_id for round_id, round_data in pending.values() if _is_round_complete(round_data)
+    )
+    save_checkpoint(path, checkpoint)
+    logger.info("Committed %s round(s). %s complete so far.", written, len(checkpoint['completed_rounds']))
+    pending.clear()
+    return True
+
+def backfill_season(league_id, season, max_workers=BACKFILL_MAX_WORKERS,
+                    requests_per_minute=BACKFILL_REQUESTS_PER_MINUTE, restart=False):
+    path = checkpoint_path(league_id, season)
+    checkpoint = None if restart else load_checkpoint(path)
+    if not checkpoint or checkpoint.get("league_id") != str(league_id) or checkpoint.get("season") != str(season):
+        checkpoint = {"league_id": str(league_id), "season": str(season), "completed_rounds": []}
+
+    # One token for the rounds listing, then one per round.
+    bucket = TokenBucket(requests_per_minute / 60.0, capacity=max(1, max_workers))
+    bucket.acquire()
+    rounds = fetch_rounds_from_api(league=league_id, season=season)
+    if rounds is None:
+        logger.error("Could not list the season's rounds. Aborting backfill.")
+        return False
+
+    completed = set(checkpoint["completed_rounds"])
+    # The live round is the tick's to write; its matches carry change stamps
+    # a backfilled copy would drop.
+    live_doc_path = (manage_firestore_state.get_current_round_pointer() or {}).get("document_path")
+    remaining = [r for r in rounds if r not in completed and _round_doc_path(league_id, season, r) != live_doc_path]
+    logger.info("%s round(s) in season %s; %s already backfilled, %s to go.", len(rounds), season, len(completed), len(remaining))
+
+    failed = []
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_fetch_round, bucket, league_id, season, r) for r in remaining]
+        for future in as_completed(futures):
+            round_id, round_data = future.result()
+            if round_data is None:
+                logger.error("Failed to fetch fixtures for round '%s'. It will be retried on the next run.", round_id)
+                failed.append(round_id)
+                continue
+            pending[_round_doc_path(league_id, season, round_id)] = (round_id, round_data)
+            if len(pending) >= min(BACKFILL_COMMIT_EVERY_ROUNDS, manage_firestore_state.FIRESTORE_BATCH_LIMIT):
+                if not _commit(pending, checkpoint, path):
+                    logger.error("Batched write failed. Stopping; rerun to resume from the checkpoint.")
+                    for f in futures:
+                        f.cancel()
+                    return False
+
+    if pending and not _commit(pending, checkpoint, path):
+        logger.error("Batched write failed. Rerun to resume from the checkpoint.")
+        return False
+
+    if failed:
+        logger.warning("Backfill finished with %s failed round(s): %s", len(failed), failed)
+        return False
+    logger.info("Backfill of season %s complete: %s round(s).", season, len(checkpoint['completed_rounds']))
+    return True
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Backfill every round of a season into Firestore.")
+    parser.add_argument("--league", default=os.getenv("API_FOOTBALL_LEAGUE_ID"))
+    parser.add_argument("--season", default=os.getenv("API_FOOTBALL_SEASON"))
+    parser.add_argument("--max-workers", type=int, default=BACKFILL_MAX_WORKERS)
+    parser.add_argument("--requests-per-minute", type=float, default=BACKFILL_REQUESTS_PER_MINUTE)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and backfill every round again.")
+    args = parser.parse_args()
+
+    if not args.league or not args.season:
+        logger.critical("League and season are required (flags or API_FOOTBALL_LEAGUE_ID/API_FOOTBALL_SEASON). Aborting.")
+    else:
+        ok = backfill_season(
+            args.league, args.season,
+            max_workers=args.max_workers,
+            requests_per_minute=args.requests_per_minute,
+            restart=args.restart
+        )
+        raise SystemExit(0 if ok else 1)
@@ -0,0 +1,111 @@
+import os
+import logging
+import threading
+
+from . import clock
+
+logger = logging.getLogger(__name__)
+
+# Upstream dependencies, one breaker each.
+API_FOOTBALL = "api_football"
+FIRESTORE = "firestore"
+REDDIT = "reddit"
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "3"))
+CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    def __init__(self, name):
+        super().__init__(f"Circuit '{name}' is open; failing fast.")
+        self.name = name
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and rejects calls
+    # until reset_timeout_seconds have passed. Then a single probe call is let
+    # through (half-open): success closes the circuit, failure reopens it.
+    def __init__(self, name, failure_threshold=CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout_seconds=CIRCUIT_BREAKER_RESET_SECONDS, monotonic=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._monotonic = monotonic or clock.monotonic
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self._monotonic() - self._opened_at >= self.reset_timeout_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._monotonic() - self._opened_at < self.reset_timeout_seconds:
+                    return False
+                self._state = HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            logger.info("Circuit '%s' is half-open. Letting a probe request through.", self.name)
+            return True
+
+    def cancel_request(self):
+        # For a request allowed through but then never sent: frees the probe
+        # slot without counting as a success or a failure.
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit '%s' closed after a successful probe.", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(
+                        "Circuit '%s' opened after %s consecutive failure(s). Failing fast for %ss.",
+                        self.name, self._failures, self.reset_timeout_seconds
+                    )
+                self._state = OPEN
+                self._opened_at = self._monotonic()
+
+    def retry_after_seconds(self):
+        with self._lock:
+            if self._state != OPEN:
+                return 0
+            return max(0, self.reset_timeout_seconds - (self._monotonic() - self._opened_at))
+
+_registry_lock = threading.Lock()
+_breakers = {}
+
+def get_breaker(name):
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+def is_open(name):
+    return get_breaker(name).state == OPEN
+
+def breaker_states():
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
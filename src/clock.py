@@ -0,0 +1,23 @@
+import time
+from datetime import datetime, timezone
+
+# Time source for everything that makes scheduling decisions. Production uses
+# the wall clock; the matchday replay driver swaps in a virtual clock.
+_utc_now_override = None
+
+def utc_now():
+    if _utc_now_override is not None:
+        return _utc_now_override()
+    return datetime.now(timezone.utc)
+
+def monotonic():
+    if _utc_now_override is not None:
+        return _utc_now_override().timestamp()
+    return time.monotonic()
+
+def set_clock(utc_now_fn):
+    global _utc_now_override
+    _utc_now_override = utc_now_fn
+
+def reset_clock():
+    set_clock(None)
@@ -0,0 +1,81 @@
+import os
+import logging
+import threading
+
+from . import clock
+from . import manage_firestore_state
+
+logger = logging.getLogger(__name__)
+
+# Within the TTL the cached round is served as is. Past it, the cached round
+# is still served while a background refresh revalidates it. Past the max age
+# the refresh happens inline, and only if that fails is the cached round
+# served, flagged as stale.
+CURRENT_ROUND_CACHE_TTL_SECONDS = float(os.getenv("CURRENT_ROUND_CACHE_TTL_SECONDS", "15"))
+CURRENT_ROUND_CACHE_MAX_AGE_SECONDS = float(os.getenv("CURRENT_ROUND_CACHE_MAX_AGE_SECONDS", "120"))
+
+_lock = threading.Lock()
+_cached = None  # (round_data, fetched_at monotonic)
+_refreshing = False
+
+def _load_current_round():
+    pointer = manage_firestore_state.get_current_round_pointer()
+    if not pointer or not pointer.get("document_path"):
+        return None
+    document_path = pointer["document_path"]
+    if document_path == "completed":
+        # The round is over and the next one not yet discovered; keep showing
+        # the finished round when the league and season are known.
+        league_id, season = os.getenv("API_FOOTBALL_LEAGUE_ID"), os.getenv("API_FOOTBALL_SEASON")
+        if not (league_id and season and pointer.get("round_id")):
+            return None
+        document_path = f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/rounds/{pointer['round_id']}"
+    return manage_firestore_state.get_round_data_by_path(document_path)
+
+def _refresh():
+    global _cached
+    round_data = _load_current_round()
+    if round_data:
+        with _lock:
+            _cached = (round_data, clock.monotonic())
+    return round_data
+
+def _background_refresh():
+    global _refreshing
+    try:
+        _refresh()
+    except Exception as e:
+        logger.error("Background refresh of the current round failed: %s", e)
+    finally:
+        with _lock:
+            _refreshing = False
+
+def _start_background_refresh():
+    global _refreshing
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+    threading.Thread(target=_background_refresh, name="current-round-refresh", daemon=True).start()
+
+def get_current_round():
+    # Returns (round_data, is_stale); round_data is None only if nothing has
+    # ever been loaded and the store cannot be read right now.
+    with _lock:
+        cached = _cached
+    if cached is not None:
+        round_data, fetched_at = cached
+        age = clock.monotonic() - fetched_at
+        if age < CURRENT_ROUND_CACHE_TTL_SECONDS:
+            return round_data, False
+        if age < CURRENT_ROUND_CACHE_MAX_AGE_SECONDS:
+            _start_background_refresh()
+            return round_data, False
+
+    fresh = _refresh()
+    if fresh:
+        return fresh, False
+    if cached is not None:
+        logger.warning("Could not revalidate the current round. Serving the last good copy as stale.")
+        return cached[0], True
+    return None, False
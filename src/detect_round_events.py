@@ -0,0 +1,173 @@
+import logging
+import hashlib
+import threading
+
+from . import clock
+from . import manage_firestore_state
+
+logger = logging.getLogger(__name__)
+
+# Event types emitted by diffing consecutive snapshots of the same round.
+KICKOFF = "kickoff"
+GOAL = "goal"
+SCORE_CORRECTION = "score_correction"
+HALF_TIME = "half_time"
+SECOND_HALF = "second_half"
+FULL_TIME = "full_time"
+POSTPONED = "postponed"
+RESCHEDULED = "rescheduled"
+MINUTE = "minute"
+
+# The live minute changes on nearly every in-play tick. It is still published
+# to subscribers, but kept out of the persisted event log.
+UNLOGGED_EVENT_TYPES = {MINUTE}
+SIGNIFICANT_EVENT_TYPES = {KICKOFF, GOAL, SCORE_CORRECTION, HALF_TIME, SECOND_HALF, FULL_TIME, POSTPONED, RESCHEDULED}
+
+_lock = threading.Lock()
+_last_snapshots = {}
+_subscribers = []
+
+def subscribe(handler, event_types=None):
+    # handler(events) is called with the matching events of every tick that
+    # produced any. event_types=None subscribes to everything.
+    _subscribers.append((handler, set(event_types) if event_types else None))
+
+def publish(events):
+    for handler, event_types in list(_subscribers):
+        matching = [e for e in events if event_types is None or e["type"] in event_types]
+        if not matching:
+            continue
+        try:
+            handler(matching)
+        except Exception as e:
+            logger.error("Round event subscriber %s failed: %s", handler, e)
+
+def _parse_score(score):
+    try:
+        home_goals, away_goals = (int(part.strip()) for part in (score or "").split("-"))
+        return home_goals, away_goals
+    except (ValueError, TypeError):
+        return None
+
+def _event(event_type, match, round_id, observed_utc, **detail):
+    return {
+        "type": event_type,
+        "fixture_id": match.get("fixture_id"),
+        "round_id": round_id,
+        "home_team": match.get("home_team"),
+        "away_team": match.get("away_team"),
+        "score": match.get("score"),
+        "status": match.get("status"),
+        "minute": match.get("live_minute"),
+        "observed_utc": observed_utc,
+        "detail": detail
+    }
+
+def _diff_match(previous, current, round_id, observed_utc):
+    events = []
+    previous_status, current_status = previous.get("status"), current.get("status")
+
+    if current.get("status_short") == "PST" and previous.get("status_short") != "PST":
+        events.append(_event(POSTPONED, current, round_id, observed_utc))
+    elif (previous.get("date"), previous.get("kick_off_time_utc")) != (current.get("date"), current.get("kick_off_time_utc")):
+        events.append(_event(RESCHEDULED, current, round_id, observed_utc,
+                             previous_date=previous.get("date"), previous_time=previous.get("kick_off_time_utc")))
+
+    if previous_status == "not_started" and current_status in {"in_play", "half_time", "completed"}:
+        events.append(_event(KICKOFF, current, round_id, observed_utc))
+
+    previous_goals, current_goals = _parse_score(previous.get("score")), _parse_score(current.get("score"))
+    if current_goals and current_goals != (previous_goals or (0, 0)):
+        before = previous_goals or (0, 0)
+        # The score a change started from, and when the match last changed,
+        # keep a goal re-scored after a correction apart from the original.
+        score_detail = {"previous_score": previous.get("score"), "previous_change_utc": previous.get("changed_utc")}
+        if current_goals[0] < before[0] or current_goals[1] < before[1]:
+            events.append(_event(SCORE_CORRECTION, current, round_id, observed_utc, **score_detail))
+        else:
+            for side, index in (("home", 0), ("away", 1)):
+                for _ in range(current_goals[index] - before[index]):
+                    events.append(_event(GOAL, current, round_id, observed_utc, side=side, **score_detail))
+
+    if current_status != previous_status:
+        if current_status == "half_time":
+            events.append(_event(HALF_TIME, current, round_id, observed_utc))
+        elif current_status == "in_play" and previous_status == "half_time":
+            events.append(_event(SECOND_HALF, current, round_id, observed_utc))
+        elif current_status == "completed":
+            events.append(_event(FULL_TIME, current, round_id, observed_utc))
+
+    if current_status == "in_play" and current.get("live_minute") != previous.get("live_minute") and not events:
+        events.append(_event(MINUTE, current, round_id, observed_utc))
+    return events
+
+def diff_snapshots(previous_round, current_round):
+    observed_utc = current_round.get("last_updated_utc") or clock.utc_now().isoformat()
+    round_id = current_round.get("round_id")
+    previous_by_fixture = {m.get("fixture_id"): m for m in (previous_round or {}).get("matches", [])}
+
+    events = []
+    for match in current_round.get("matches", []):
+        previous = previous_by_fixture.get(match.get("fixture_id"))
+        if previous is None:
+            continue
+        events.extend(_diff_match(previous, match, round_id, observed_utc))
+    return events
+
+def _previous_snapshot(round_doc_path):
+    with _lock:
+        snapshot = _last_snapshots.get(round_doc_path)
+    if snapshot is not None:
+        return snapshot
+    # Cold instance: the last persisted round document is the previous snapshot.
+    return manage_firestore_state.get_document_by_path(round_doc_path)
+
+def stamp_changes(previous_round, current_round, events):
+    # Stamps each match with changed_utc: when its latest significant change
+    # was first observed upstream. Unchanged matches carry their stamp over,
+    # so freshness can be measured at every later stage the change reaches.
+    changed_fixture_ids = {e["fixture_id"] for e in events if e["type"] in SIGNIFICANT_EVENT_TYPES}
+    observed_by_fixture = {e["fixture_id"]: e["observed_utc"] for e in events}
+    previous_by_fixture = {m.get("fixture_id"): m for m in (previous_round or {}).get("matches", [])}
+    for match in current_round.get("matches", []):
+        fixture_id = match.get("fixture_id")
+        if fixture_id in changed_fixture_ids:
+            match["changed_utc"] = observed_by_fixture[fixture_id]
+        elif previous_by_fixture.get(fixture_id, {}).get("changed_utc"):
+            match["changed_utc"] = previous_by_fixture[fixture_id]["changed_utc"]
+
+def detect_events(round_doc_path, round_data):
+    previous = _previous_snapshot(round_doc_path)
+    if previous is None:
+        logger.info("No previous snapshot for %s. Using this tick as the baseline.", round_doc_path)
+        return []
+    events = diff_snapshots(previous, round_data)
+    stamp_changes(previous, round_data, events)
+    if events:
+        logger.info("Detected %s round event(s): %s", len(events), sorted({e['type'] for e in events}))
+    return events
+
+def _event_key(event):
+    detail = ",".join(f"{k}={v}" for k, v in sorted(event["detail"].items()))
+    return "|".join(str(event.get(k)) for k in ("fixture_id", "type", "score", "status")) + "|" + detail
+
+def stage_event_log(writes, round_doc_path, events):
+    # Ids derive from the event's content, not the tick, so a retried tick
+    # rewrites the same log entries instead of appending duplicates.
+    seen = {}
+    for event in events:
+        if event["type"] in UNLOGGED_EVENT_TYPES:
+            continue
+        key = _event_key(event)
+        seen[key] = seen.get(key, 0) + 1
+        event_id = hashlib.sha1(f"{key}|{seen[key]}".encode("utf-8")).hexdigest()[:20]
+        writes.set_document(f"{round_doc_path}/events/{event_id}", event)
+
+def remember_snapshot(round_doc_path, round_data):
+    with _lock:
+        # Only the current round's snapshot is ever needed.
+        _last_snapshots.clear()
+        _last_snapshots[round_doc_path] = round_data
+
+def has_significant_events(events):
+    return any(e["type"] in SIGNIFICANT_EVENT_TYPES for e in events)
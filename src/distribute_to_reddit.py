@@ -2,13 +2,84 @@ import os
 import logging
 import requests
 import json
-from datetime import datetime, timezone
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote_plus
-from pytz import timezone as pytz_timezone
+
+from . import clock
+from . import render_reddit_post
+from . import manage_firestore_state
+from . import circuit_breaker
+from . import season_calendar
+from . import freshness
+from . import tick_deadline
 
 logger = logging.getLogger(__name__)
 
+# Round titles repeat every season, so only recent submissions are trusted
+# when rebuilding the post index from the bot account's history.
+POST_INDEX_BACKFILL_MAX_AGE_DAYS = 180
+# Threads go up shortly before kickoff; allow this much slack before the
+# season's first fixture when deciding whether a thread belongs to it.
+SEASON_START_MARGIN_DAYS = 2
+# Refresh a little before Reddit's stated expiry so in-flight calls never race it.
+ACCESS_TOKEN_EXPIRY_MARGIN_SECONDS = 120
+
+# Edits to the same post are merged and spaced at least this far apart.
+# Urgent edits (goals, full time) only have to respect the shorter interval.
+MIN_EDIT_INTERVAL_SECONDS = float(os.getenv("REDDIT_MIN_EDIT_INTERVAL_SECONDS", "120"))
+MIN_URGENT_EDIT_INTERVAL_SECONDS = float(os.getenv("REDDIT_MIN_URGENT_EDIT_INTERVAL_SECONDS", "15"))
+MAX_EDIT_ATTEMPTS = 5
+EDIT_RETRY_BASE_SECONDS = 15
+EDIT_RETRY_MAX_SECONDS = 600
+# Due edits are published concurrently, one call per post at a time, so a slow
+# or failing subreddit never holds up edits to the others.
+EDIT_PUBLISH_MAX_WORKERS = int(os.getenv("REDDIT_EDIT_PUBLISH_MAX_WORKERS", "8"))
+# How long publish_due_edits() waits for the edits it started.
+EDIT_PUBLISH_TIMEOUT_SECONDS = float(os.getenv("REDDIT_EDIT_PUBLISH_TIMEOUT_SECONDS", "20"))
+
+# Access tokens are shared by every subreddit target, so one refresh serves all.
+_access_token_lock = threading.Lock()
+_access_token = None
+_access_token_expires_at = None
+
+# (league_id, season, subreddit) whose post index this process knows is backfilled.
+_post_index_backfilled = set()
+
+def _reddit_request(method, url, **kwargs):
+    # Fails fast while Reddit's circuit is open. Transport errors and 5xx
+    # responses count against the circuit; anything else means Reddit answered.
+    # Calls made on a tick's thread are capped at its remaining budget.
+    breaker = circuit_breaker.get_breaker(circuit_breaker.REDDIT)
+    if not breaker.allow_request():
+        raise circuit_breaker.CircuitOpenError(circuit_breaker.REDDIT)
+    kwargs["timeout"] = tick_deadline.timeout_for(kwargs.get("timeout"))
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
 def _refresh_access_token():
+    global _access_token, _access_token_expires_at
+    with _access_token_lock:
+        if _access_token and _access_token_expires_at and datetime.now(timezone.utc) < _access_token_expires_at:
+            return _access_token
+        new_access_token, expires_in = _request_access_token()
+        if new_access_token:
+            _access_token = new_access_token
+            _access_token_expires_at = datetime.now(timezone.utc) + timedelta(
+                seconds=max(0, expires_in - ACCESS_TOKEN_EXPIRY_MARGIN_SECONDS)
+            )
+        return new_access_token
+
+def _request_access_token():
     logger.info("Attempting to refresh Reddit access token.")
     client_id = os.getenv("REDDIT_CLIENT_ID")
     client_secret = os.getenv("REDDIT_CLIENT_SECRET")
@@ -17,7 +88,7 @@ def _refresh_access_token():
 
     if not all([client_id, client_secret, refresh_token, user_agent]):
         logger.error("Reddit API environment variables are missing.")
-        return None
+        return None, 0
 
     token_endpoint = "https://www.reddit.com/api/v1/access_token"
     headers = {"User-Agent": user_agent}
@@ -25,84 +96,38 @@ def _refresh_access_token():
     auth = (client_id, client_secret)
 
     try:
-        response = requests.post(url=token_endpoint, auth=auth, headers=headers, data=data, timeout=15)
+        response = _reddit_request("POST", token_endpoint, auth=auth, headers=headers, data=data, timeout=15)
         response.raise_for_status()
         token_data = response.json()
         new_access_token = token_data.get("access_token")
         if not new_access_token:
             logger.error("Token refresh response did not contain an access_token.")
-            return None
+            return None, 0
         logger.info("Successfully refreshed Reddit access token.")
-        return new_access_token
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error during Reddit token refresh: {e}")
-        return None
+        return new_access_token, int(token_data.get("expires_in", 3600))
+    except (requests.exceptions.RequestException, circuit_breaker.CircuitOpenError) as e:
+        logger.error("Error during Reddit token refresh: %s", e)
+        return None, 0
 
 def _format_post_body(round_data):
-    if not round_data or "matches" not in round_data:
-        logger.error("Cannot format post body, invalid round_data provided.")
-        return None, None
+    return render_reddit_post.render_post(round_data)
 
-    gr_timezone = pytz_timezone('Europe/Athens')
-    competition_name = round_data.get("competition_name", "League")
-    round_id = round_data.get("round_id")
-    
-    try:
-        last_updated_utc_str = round_data.get("last_updated_utc", datetime.now(timezone.utc).isoformat())
-        utc_dt = datetime.fromisoformat(last_updated_utc_str)
-        gr_dt = utc_dt.astimezone(gr_timezone)
-        last_updated_display = gr_dt.strftime('%Y-%m-%d %H:%M:%S') + " (GR)"
-    except (ValueError, TypeError):
-        last_updated_display = f"{last_updated_utc_str} (UTC)"
-
-    title = f"{competition_name} Watch - {round_id}"
-    
-    header = "| Home | Score | Away | Status |\n"
-    header += "|:---|:---:|:---|:---|\n"
+def _oldest_trusted_post_time(league_id, season):
+    # Submissions older than this cannot be the current season's thread for a
+    # title. None when the season's start is unknown.
+    oldest_allowed = clock.utc_now() - timedelta(days=POST_INDEX_BACKFILL_MAX_AGE_DAYS)
+    if league_id is None or season is None:
+        return oldest_allowed
+    start = season_calendar.season_start(league_id, season)
+    if start is None:
+        return None
+    return max(oldest_allowed, start - timedelta(days=SEASON_START_MARGIN_DAYS))
 
-    body_lines = []
-    for match in round_data["matches"]:
-        home_greek = match.get('home_team_greek') or match.get('home_team', 'N/A')
-        away_greek = match.get('away_team_greek') or match.get('away_team', 'N/A')
-        
-        score = match.get('score', '-').strip() if (match.get('score') or "").strip() else "-"
-        
-        status_val = match.get('status', 'scheduled')
-        status_display = "Scheduled"
-        if status_val == "in_play":
-            minute = match.get('live_minute', '')
-            status_display = f"🔴 Live ({minute}')"
-        elif status_val == "half_time":
-            status_display = f"⏸️ Half Time"
-        elif status_val == "completed":
-            status_display = f"🏁 Full Time"
-        elif status_val == "not_started":
-            try:
-                date_str = match.get('date', '')
-                time_str = match.get('kick_off_time_utc', '')
-                if len(time_str) <= 2: time_str += ":00"
-                
-                utc_dt_str = f"{date_str}T{time_str}:00Z"
-                match_utc_dt = datetime.fromisoformat(utc_dt_str.replace('Z', '+00:00'))
-                match_gr_dt = match_utc_dt.astimezone(gr_timezone)
-                status_display = f"📅 {match_gr_dt.strftime('%Y-%m-%d %H:%M')}"
-            except (ValueError, TypeError):
-                status_display = f"📅 {date_str} {time_str} (UTC)"
-
-        line = f"| **{home_greek}** | **{score}** | **{away_greek}** | {status_display} |"
-        body_lines.append(line)
-    
-    thumbnail_url = os.getenv("REDDIT_THUMBNAIL_URL")
-    if thumbnail_url:
-        footer = f"\n\n---\n*Τελευταία Ανανέωση: [**:**]({thumbnail_url}) {last_updated_display}*"
-    else:
-        footer = f"\n\n---\n*Τελευταία Ανανέωση: {last_updated_display}*"
-    
-    full_body = header + "\n".join(body_lines) + footer
-    return title, full_body
+def _created_utc(post):
+    return datetime.fromtimestamp(post.get("created_utc", 0), tz=timezone.utc)
 
-def _find_existing_post_id(access_token, subreddit, title):
-    logger.info(f"Searching for existing post with title '{title}' in r/{subreddit}")
+def _find_existing_post_id(access_token, subreddit, title, oldest_allowed=None):
+    logger.info("Searching for existing post with title '%s' in r/%s", title, subreddit)
     user_agent = os.getenv("REDDIT_USER_AGENT")
     headers = {"Authorization": f"Bearer {access_token}", "User-Agent": user_agent}
     
@@ -110,52 +135,120 @@ def _find_existing_post_id(access_token, subreddit, title):
     params = {"q": f'title:"{title}"', "restrict_sr": "on", "sort": "new", "limit": 1}
 
     try:
-        response = requests.get(search_url, headers=headers, params=params, timeout=15)
+        response = _reddit_request("GET", search_url, headers=headers, params=params, timeout=15)
         response.raise_for_status()
         results = response.json()
         posts = results.get("data", {}).get("children", [])
         if posts and posts[0].get("data", {}).get("title") == title:
+            if oldest_allowed is not None and _created_utc(posts[0]["data"]) < oldest_allowed:
+                logger.info("Newest post titled '%s' predates this season. Ignoring it.", title)
+                return None
             post_id = posts[0].get("data", {}).get("name")
-            logger.info(f"Found existing post with matching title. ID: {post_id}")
+            logger.info("Found existing post with matching title. ID: %s", post_id)
             return post_id
-    except requests.exceptions.RequestException as e:
-        logger.error(f"API error while searching for post: {e}")
+    except (requests.exceptions.RequestException, circuit_breaker.CircuitOpenError) as e:
+        logger.error("API error while searching for post: %s", e)
     
     logger.info("No existing post found with the exact title.")
     return None
 
-def _create_post(access_token, subreddit, title, markdown_body):
-    logger.info(f"Creating new post in r/{subreddit}")
+def _backfill_post_index(access_token, subreddit, league_id, season):
+    # Returns the number of posts indexed, or None if history could not be read.
+    oldest_allowed = _oldest_trusted_post_time(league_id, season)
+    if oldest_allowed is None:
+        # Round titles repeat every season; without the season's start date a
+        # submission cannot be told apart from last season's thread.
+        logger.warning("Season %s start date unknown. Skipping Reddit post index backfill.", season)
+        return None
+
+    logger.info("Backfilling Reddit post index from the bot account's submissions in r/%s", subreddit)
+    user_agent = os.getenv("REDDIT_USER_AGENT")
+    headers = {"Authorization": f"Bearer {access_token}", "User-Agent": user_agent}
+
+    try:
+        response = _reddit_request("GET", "https://oauth.reddit.com/api/v1/me", headers=headers, timeout=15)
+        response.raise_for_status()
+        username = response.json().get("name")
+        if not username:
+            logger.error("Could not resolve the bot account's username for post index backfill.")
+            return None
+
+        response = _reddit_request(
+            "GET",
+            f"https://oauth.reddit.com/user/{username}/submitted",
+            headers=headers, params={"sort": "new", "limit": 100}, timeout=15
+        )
+        response.raise_for_status()
+        submissions = response.json().get("data", {}).get("children", [])
+    except (requests.exceptions.RequestException, circuit_breaker.CircuitOpenError) as e:
+        logger.error("API error while reading submission history for post index backfill: %s", e)
+        return None
+
+    indexed_titles = set()
+    for submission in submissions:
+        post = submission.get("data", {})
+        title = post.get("title")
+        if not title or title in indexed_titles or " Watch - " not in title:
+            continue
+        if (post.get("subreddit") or "").lower() != subreddit.lower():
+            continue
+        if _created_utc(post) < oldest_allowed:
+            continue
+        # History is newest first, so the first match per title is the live thread.
+        indexed_titles.add(title)
+        manage_firestore_state.index_post_id(league_id, season, title, subreddit, post.get("name"), source="history")
+
+    logger.info("Backfilled %s post(s) into the Reddit post index.", len(indexed_titles))
+    return len(indexed_titles)
+
+def _backfill_post_index_once(access_token, subreddit, league_id, season):
+    # The bot's history only has to be read into the index once per season and
+    # subreddit. A Firestore marker records that across instances; the set
+    # spares this process even the marker read.
+    key = (str(league_id), str(season), subreddit.lower())
+    if key in _post_index_backfilled:
+        return 0
+    if manage_firestore_state.is_post_index_backfilled(league_id, season, subreddit):
+        _post_index_backfilled.add(key)
+        return 0
+    indexed = _backfill_post_index(access_token, subreddit, league_id, season)
+    if indexed is None:
+        return 0
+    if manage_firestore_state.mark_post_index_backfilled(league_id, season, subreddit, indexed):
+        _post_index_backfilled.add(key)
+    return indexed
+
+def _create_post(access_token, subreddit, title, markdown_body, flair_id=None):
+    logger.info("Creating new post in r/%s", subreddit)
     user_agent = os.getenv("REDDIT_USER_AGENT")
     headers = {"Authorization": f"Bearer {access_token}", "User-Agent": user_agent}
     data = {"sr": subreddit, "title": title, "kind": "self", "text": markdown_body, "api_type": "json"}
 
-    flair_id = os.getenv("SUBREDDIT_FLAIR_ID")
     if flair_id:
         data["flair_id"] = flair_id
-        logger.info(f"Applying flair ID: {flair_id}")
+        logger.info("Applying flair ID: %s", flair_id)
 
     try:
-        response = requests.post("https://oauth.reddit.com/api/submit", headers=headers, data=data, timeout=30)
+        response = _reddit_request("POST", "https://oauth.reddit.com/api/submit", headers=headers, data=data, timeout=30)
         response.raise_for_status()
         response_json = response.json()
         if response_json.get("json", {}).get("errors"):
-            logger.error(f"Reddit API returned errors on post creation: {response_json['json']['errors']}")
+            logger.error("Reddit API returned errors on post creation: %s", response_json['json']['errors'])
             return None
         post_id = response_json.get("json", {}).get("data", {}).get("name")
         if not post_id:
             logger.error("Post creation successful but no post ID ('name') found in response.")
             return None
-        logger.info(f"Successfully created new Reddit post. ID: {post_id}")
+        logger.info("Successfully created new Reddit post. ID: %s", post_id)
         return post_id
-    except requests.exceptions.RequestException as e:
-        logger.error(f"HTTP error creating post: {e}")
+    except (requests.exceptions.RequestException, circuit_breaker.CircuitOpenError) as e:
+        logger.error("HTTP error creating post: %s", e)
         return None
 
 def update_post(post_id, round_data):
-    logger.info(f"Attempting to update Reddit post {post_id}")
+    logger.info("Attempting to update Reddit post %s", post_id)
     if not post_id or not post_id.startswith('t3_'):
-        logger.error(f"Invalid post_id provided for update: {post_id}. It must start with 't3_'.")
+        logger.error("Invalid post_id provided for update: %s. It must start with 't3_'.", post_id)
         return False
         
     access_token = _refresh_access_token()
@@ -169,36 +262,201 @@ def update_post(post_id, round_data):
     data = {"thing_id": post_id, "text": markdown_body, "api_type": "json"}
     
     try:
-        response = requests.post("https://oauth.reddit.com/api/editusertext", headers=headers, data=data, timeout=30)
+        response = _reddit_request("POST", "https://oauth.reddit.com/api/editusertext", headers=headers, data=data, timeout=30)
         response.raise_for_status()
         response_json = response.json()
         if response_json.get("json", {}).get("errors"):
-            logger.error(f"Reddit API returned errors on post update: {response_json['json']['errors']}")
+            logger.error("Reddit API returned errors on post update: %s", response_json['json']['errors'])
             return False
-        logger.info(f"Successfully updated post {post_id}")
+        logger.info("Successfully updated post %s", post_id)
+        freshness.record_round(freshness.PUBLISHED, round_data, target=post_id)
         return True
-    except requests.exceptions.RequestException as e:
-        logger.error(f"HTTP error updating post: {e}")
+    except (requests.exceptions.RequestException, circuit_breaker.CircuitOpenError) as e:
+        logger.error("HTTP error updating post: %s", e)
         return False
 
-def create_or_get_post(round_data):
+class PendingEdit:
+    # The latest body queued for one post. Later updates replace round_data in
+    # place, so waiting on `done` means waiting for the newest body to land.
+    def __init__(self, post_id, round_data, urgent):
+        self.post_id = post_id
+        self.round_data = round_data
+        self.urgent = urgent
+        self.attempts = 0
+        self.not_before = None
+        self.ok = None
+        self.done = threading.Event()
+
+# The queue only debounces edits and keeps each post's interval; the edits
+# themselves run on _publish_executor.
+_publish_condition = threading.Condition()
+_pending_edits = {}
+_publishing_edits = {}
+_last_edit_at = {}
+_publisher_thread = None
+_publish_executor = ThreadPoolExecutor(max_workers=EDIT_PUBLISH_MAX_WORKERS, thread_name_prefix="reddit-publish")
+# The replay driver turns the background thread off and calls
+# publish_due_edits() itself, so edits follow the virtual clock.
+PUBLISHER_THREAD_ENABLED = True
+
+def _edit_due_at(edit):
+    last_edit_at = _last_edit_at.get(edit.post_id)
+    interval = MIN_URGENT_EDIT_INTERVAL_SECONDS if edit.urgent else MIN_EDIT_INTERVAL_SECONDS
+    due_at = last_edit_at + interval if last_edit_at is not None else 0
+    return max(due_at, edit.not_before or 0)
+
+def _finish_edit(edit, ok):
+    edit.ok = ok
+    edit.done.set()
+
+def _publish_edit(edit):
+    ok = update_post(edit.post_id, edit.round_data)
+    with _publish_condition:
+        # Failed attempts count too: the interval caps calls, not successes.
+        _last_edit_at[edit.post_id] = clock.monotonic()
+        if ok:
+            _finish_edit(edit, True)
+            return
+        newer = _pending_edits.get(edit.post_id)
+        edit.attempts += 1
+        if newer is not None or edit.attempts >= MAX_EDIT_ATTEMPTS:
+            if newer is None:
+                logger.error("Giving up on editing post %s after %s attempts.", edit.post_id, edit.attempts)
+            _finish_edit(edit, False)
+            return
+        backoff = min(EDIT_RETRY_MAX_SECONDS, EDIT_RETRY_BASE_SECONDS * 2 ** (edit.attempts - 1))
+        edit.not_before = clock.monotonic() + backoff
+        _pending_edits[edit.post_id] = edit
+        logger.warning("Editing post %s failed. Retrying in %ss.", edit.post_id, backoff)
+
+def _take_due_edits():
+    # Returns (edits due now, seconds until the next queued edit is due, or
+    # None). Posts with an edit already being published wait for it to finish.
+    # Caller holds the lock.
+    due, wait_seconds = [], None
+    now = clock.monotonic()
+    for edit in list(_pending_edits.values()):
+        if edit.post_id in _publishing_edits:
+            continue
+        edit_wait = _edit_due_at(edit) - now
+        if edit_wait > 0:
+            wait_seconds = edit_wait if wait_seconds is None else min(wait_seconds, edit_wait)
+            continue
+        del _pending_edits[edit.post_id]
+        _publishing_edits[edit.post_id] = edit
+        due.append(edit)
+    return due, wait_seconds
+
+def _run_edit(edit):
+    try:
+        _publish_edit(edit)
+    except Exception as e:
+        logger.error("Unexpected error publishing edit to post %s: %s", edit.post_id, e)
+        _finish_edit(edit, False)
+    finally:
+        with _publish_condition:
+            _publishing_edits.pop(edit.post_id, None)
+            # A newer body for this post may have become publishable.
+            _publish_condition.notify()
+
+def publish_due_edits():
+    # Publishes every edit due now, concurrently, and waits for them up to
+    # EDIT_PUBLISH_TIMEOUT_SECONDS (capped by the tick's budget). Edits still
+    # running after that finish in the background.
+    with _publish_condition:
+        due, _ = _take_due_edits()
+    futures = [_publish_executor.submit(_run_edit, edit) for edit in due]
+    if futures:
+        wait(futures, timeout=tick_deadline.timeout_for(EDIT_PUBLISH_TIMEOUT_SECONDS))
+    return len(futures)
+
+def queued_edits():
+    # {post_id: urgent} for every edit not yet published, including those
+    # being published right now, which may still fail and be retried.
+    with _publish_condition:
+        edits = dict(_publishing_edits, **_pending_edits)
+        return {post_id: edit.urgent for post_id, edit in edits.items()}
+
+def _publisher_loop():
+    while True:
+        with _publish_condition:
+            due, wait_seconds = _take_due_edits()
+            while not due:
+                _publish_condition.wait(timeout=wait_seconds)
+                due, wait_seconds = _take_due_edits()
+        for edit in due:
+            _publish_executor.submit(_run_edit, edit)
+
+def _ensure_publisher():
+    global _publisher_thread
+    if PUBLISHER_THREAD_ENABLED and (_publisher_thread is None or not _publisher_thread.is_alive()):
+        _publisher_thread = threading.Thread(target=_publisher_loop, name="reddit-publisher", daemon=True)
+        _publisher_thread.start()
+
+def enqueue_update(post_id, round_data, urgent=False):
+    # Queues round_data as the next body of post_id and returns at once. The
+    # background publisher edits the post when its interval allows; urgent
+    # updates go out as soon as the shorter urgent interval allows.
+    with _publish_condition:
+        edit = _pending_edits.get(post_id)
+        if edit is None:
+            edit = PendingEdit(post_id, round_data, urgent)
+            _pending_edits[post_id] = edit
+        else:
+            edit.round_data = round_data
+            edit.urgent = edit.urgent or urgent
+        _ensure_publisher()
+        _publish_condition.notify()
+    return edit
+
+def create_or_get_post(round_data, league_id=None, season=None, subreddit=None):
     logger.info("Attempting to create or get Reddit post.")
-    subreddit = os.getenv("TARGET_SUBREDDIT")
+    primary_subreddit = os.getenv("TARGET_SUBREDDIT")
+    subreddit = subreddit or primary_subreddit
     if not subreddit:
         logger.error("TARGET_SUBREDDIT is not set in environment.")
         return None
 
+    if not round_data or "matches" not in round_data:
+        logger.error("Cannot create post, invalid round_data provided.")
+        return None
+    title = render_reddit_post.render_title(round_data)
+
+    # The post index turns the lookup into a single key read. Without a league
+    # and season (ad-hoc CLI use) it is skipped and search is used directly.
+    use_index = league_id is not None and season is not None
+    if use_index:
+        indexed_post_id = manage_firestore_state.get_indexed_post_id(league_id, season, title, subreddit)
+        if indexed_post_id:
+            logger.info("Found post %s in the Reddit post index.", indexed_post_id)
+            return indexed_post_id
+
     access_token = _refresh_access_token()
     if not access_token: return None
     
-    title, markdown_body = _format_post_body(round_data)
-    if not title or not markdown_body: return None
-    
-    existing_post_id = _find_existing_post_id(access_token, subreddit, title)
+    _, markdown_body = _format_post_body(round_data)
+    if not markdown_body: return None
+
+    if use_index and _backfill_post_index_once(access_token, subreddit, league_id, season):
+        indexed_post_id = manage_firestore_state.get_indexed_post_id(league_id, season, title, subreddit)
+        if indexed_post_id:
+            logger.info("Found post %s in the Reddit post index after backfill.", indexed_post_id)
+            return indexed_post_id
+
+    # Last resort: Reddit search is slow, rate-limited and eventually consistent.
+    oldest_allowed = _oldest_trusted_post_time(league_id, season) if use_index else None
+    existing_post_id = _find_existing_post_id(access_token, subreddit, title, oldest_allowed=oldest_allowed)
     if existing_post_id:
+        if use_index:
+            manage_firestore_state.index_post_id(league_id, season, title, subreddit, existing_post_id, source="search")
         return existing_post_id
     
-    return _create_post(access_token, subreddit, title, markdown_body)
+    # Flair ids are per subreddit, so the configured one only applies to the primary target.
+    flair_id = os.getenv("SUBREDDIT_FLAIR_ID") if subreddit == primary_subreddit else None
+    new_post_id = _create_post(access_token, subreddit, title, markdown_body, flair_id=flair_id)
+    if new_post_id and use_index:
+        manage_firestore_state.index_post_id(league_id, season, title, subreddit, new_post_id, source="created")
+    return new_post_id
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -212,13 +470,13 @@ if __name__ == "__main__":
                        key=lambda f: os.path.getmtime(os.path.join(EXPORT_DIR, f)), reverse=True)
         if files: latest_file_path = os.path.join(EXPORT_DIR, files[0])
     except FileNotFoundError:
-        logger.warning(f"Export directory '{EXPORT_DIR}' not found.")
+        logger.warning("Export directory '%s' not found.", EXPORT_DIR)
 
     if not latest_file_path:
         logger.error("No prepared state file found in 'exports/'. Aborting CLI test.")
     else:
-        logger.info(f"--- Reddit Distributor CLI Test ---")
-        logger.info(f"Using latest data file: {latest_file_path}")
+        logger.info("--- Reddit Distributor CLI Test ---")
+        logger.info("Using latest data file: %s", latest_file_path)
 
         with open(latest_file_path, 'r', encoding='utf-8') as f: test_round_data = json.load(f)
 
@@ -230,16 +488,16 @@ if __name__ == "__main__":
             try:
                 with open(preview_filename, 'w', encoding='utf-8') as pf:
                     pf.write(f"# {preview_title}\n\n{preview_body}")
-                logger.info(f"📝 Markdown preview saved to: {preview_filename}")
+                logger.info("📝 Markdown preview saved to: %s", preview_filename)
             except Exception as e:
-                logger.error(f"Failed to save markdown preview: {e}")
+                logger.error("Failed to save markdown preview: %s", e)
         # -------------------------------
         
         logger.info("\n1. Testing 'create_or_get_post' with new formatting...")
         post_id = create_or_get_post(test_round_data)
 
         if post_id:
-            logger.info(f"Success. Got Post ID: {post_id}")
+            logger.info("Success. Got Post ID: %s", post_id)
             logger.info("\n2. Testing 'update_post' with the same data to confirm formatting...")
             update_success = update_post(post_id, test_round_data)
             if update_success:
@@ -0,0 +1,216 @@
+import os
+import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+from . import clock
+from . import distribute_to_reddit
+from . import tick_deadline
+from .rate_limiter import TokenBucket
+from .team_mappings import MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+# Per-target budget for thread creation. Edits are paced separately by the
+# publish queue in distribute_to_reddit.
+TARGET_EDITS_PER_MINUTE = float(os.getenv("REDDIT_TARGET_EDITS_PER_MINUTE", "2"))
+TARGET_BURST = int(os.getenv("REDDIT_TARGET_BURST", "2"))
+DISTRIBUTION_TIMEOUT_SECONDS = float(os.getenv("REDDIT_DISTRIBUTION_TIMEOUT_SECONDS", "20"))
+MAX_WORKERS = int(os.getenv("REDDIT_DISTRIBUTION_MAX_WORKERS", "8"))
+MAX_RETRY_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 15
+RETRY_MAX_SECONDS = 600
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="reddit-distribution")
+_targets_lock = threading.Lock()
+_targets = {}
+
+class _Target:
+    # Each subreddit has its own rate limiter and a single-slot retry queue:
+    # a newer round body always supersedes an older pending one, so retries
+    # never publish stale data.
+    def __init__(self, subreddit):
+        self.subreddit = subreddit
+        self.bucket = TokenBucket(TARGET_EDITS_PER_MINUTE / 60.0, TARGET_BURST, clock=clock.monotonic)
+        self.lock = threading.Lock()
+        self.pending = None
+        self.post_id = None
+        self.attempts = 0
+        self.next_attempt_at = None
+        self.last_error = None
+        self.future = None
+
+def _subreddit_from_url(url):
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    if len(parts) >= 2 and parts[0].lower() == "r":
+        return parts[1]
+    return None
+
+def get_primary_subreddit():
+    return os.getenv("TARGET_SUBREDDIT")
+
+def get_target_subreddits():
+    targets = []
+    primary = get_primary_subreddit()
+    if primary:
+        targets.append(primary)
+    for name in (os.getenv("TARGET_SUBREDDITS") or "").split(","):
+        if name.strip():
+            targets.append(name.strip())
+    if os.getenv("DISTRIBUTE_TO_CLUB_SUBREDDITS", "false").lower() == "true":
+        for url in MAPPINGS["team_to_subreddit"].values():
+            name = _subreddit_from_url(url)
+            if name:
+                targets.append(name)
+
+    unique_targets = []
+    seen = set()
+    for name in targets:
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            unique_targets.append(name)
+    return unique_targets
+
+def _get_target(subreddit):
+    with _targets_lock:
+        target = _targets.get(subreddit)
+        if target is None:
+            target = _Target(subreddit)
+            _targets[subreddit] = target
+        return target
+
+def _perform(target, job):
+    if job["action"] == "create":
+        post_id = distribute_to_reddit.create_or_get_post(
+            job["round_data"], league_id=job["league_id"], season=job["season"], subreddit=target.subreddit
+        )
+        return post_id
+    distribute_to_reddit.enqueue_update(job["post_id"], job["round_data"], urgent=job.get("urgent", False))
+    return job["post_id"]
+
+def _drain_target(target):
+    while True:
+        # Every exit clears target.future under the lock, so a job queued
+        # after this drainer decided to stop always gets a fresh drainer.
+        with target.lock:
+            job = target.pending
+            if job is None:
+                target.future = None
+                return
+            if target.next_attempt_at and clock.utc_now() < target.next_attempt_at:
+                target.future = None
+                return
+            if job["action"] == "create" and not target.bucket.try_acquire():
+                logger.info("Rate limit reached for r/%s. Keeping update queued for the next tick.", target.subreddit)
+                target.future = None
+                return
+
+        try:
+            post_id = _perform(target, job)
+            error = None if post_id else "request failed"
+        except Exception as e:
+            post_id, error = None, str(e)
+
+        with target.lock:
+            if post_id:
+                target.post_id = post_id
+                target.attempts = 0
+                target.next_attempt_at = None
+                target.last_error = None
+                if target.pending is job:
+                    target.pending = None
+                elif target.pending and target.pending["action"] == "create":
+                    # A newer body arrived while creating; it now applies as an edit.
+                    target.pending = dict(target.pending, action="update", post_id=post_id)
+                continue
+
+            target.attempts += 1
+            target.last_error = error
+            if target.attempts >= MAX_RETRY_ATTEMPTS:
+                logger.error("Giving up on r/%s after %s attempts: %s", target.subreddit, target.attempts, error)
+                if target.pending is job:
+                    target.pending = None
+                target.attempts = 0
+                target.next_attempt_at = None
+                target.future = None
+                return
+            backoff = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (target.attempts - 1))
+            target.next_attempt_at = clock.utc_now() + timedelta(seconds=backoff)
+            logger.warning("Distribution to r/%s failed (%s). Retrying in %ss.", target.subreddit, error, backoff)
+            target.future = None
+            return
+
+def _schedule_drain(target):
+    with target.lock:
+        if target.future is not None and not target.future.done():
+            return target.future
+        target.future = _executor.submit(_drain_target, target)
+        return target.future
+
+def distribute_round(round_data, post_ids, create_missing, update_existing, league_id=None, season=None,
+                     urgent=False, confirm=False):
+    # Publishes round_data to every configured subreddit concurrently. Returns
+    # the updated {subreddit: post_id} map along with which targets are done
+    # and which still have work queued for retry. Edits to existing threads
+    # only go onto the publish queue; with confirm=True (the final update)
+    # they count as done once they have actually been published.
+    subreddits = get_target_subreddits()
+    if not subreddits:
+        logger.error("No target subreddits configured (TARGET_SUBREDDIT / TARGET_SUBREDDITS).")
+        return {"post_ids": dict(post_ids), "succeeded": [], "pending": []}
+
+    futures = {}
+    edits = {}
+    for subreddit in subreddits:
+        target = _get_target(subreddit)
+        # Only the caller's post ids are trusted: they are scoped to the current
+        # round. A create that finished after a previous tick's timeout is
+        # found again through the post index instead of being duplicated.
+        known_post_id = post_ids.get(subreddit)
+        if known_post_id and update_existing:
+            edits[subreddit] = distribute_to_reddit.enqueue_update(known_post_id, round_data, urgent=urgent)
+            continue
+        elif not known_post_id and create_missing:
+            job = {"action": "create", "post_id": None}
+        else:
+            continue
+        job.update(round_data=round_data, league_id=league_id, season=season, urgent=urgent)
+        with target.lock:
+            target.post_id = known_post_id
+            target.pending = job
+        futures[subreddit] = _schedule_drain(target)
+
+    # Anything still running after the timeout keeps going in the background
+    # and is reported as pending; it never holds up the tick.
+    timeout = tick_deadline.timeout_for(DISTRIBUTION_TIMEOUT_SECONDS)
+    deadline = time.monotonic() + timeout
+    wait(list(futures.values()), timeout=timeout)
+
+    updated_post_ids = dict(post_ids)
+    succeeded, pending = [], []
+    if confirm and edits and tick_deadline.allows_low_priority("publishing the final Reddit edits inline"):
+        # Publish whatever is already due on this thread rather than waiting
+        # for the background publisher to get to it.
+        distribute_to_reddit.publish_due_edits()
+    for subreddit, edit in edits.items():
+        if confirm:
+            edit.done.wait(timeout=max(0, deadline - time.monotonic()))
+            if not edit.ok:
+                pending.append(subreddit)
+                continue
+        succeeded.append(subreddit)
+    for subreddit in futures:
+        target = _get_target(subreddit)
+        with target.lock:
+            if target.post_id:
+                updated_post_ids[subreddit] = target.post_id
+            if target.pending is None and target.last_error is None:
+                succeeded.append(subreddit)
+            else:
+                pending.append(subreddit)
+
+    logger.info("Distribution finished. Succeeded: %s. Pending: %s.", succeeded, pending)
+    return {"post_ids": updated_post_ids, "succeeded": succeeded, "pending": pending}
@@ -0,0 +1,121 @@
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from . import clock
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages a match change passes through after it is first observed in
+# an API-Football response.
+PERSISTED = "persisted"
+SERVED = "served"
+PUBLISHED = "published"
+STAGES = (PERSISTED, SERVED, PUBLISHED)
+
+# Bucket upper bounds in seconds, roughly 25% apart from 0.1s to an hour.
+# Percentiles are reported as the upper bound of the bucket they fall in.
+BUCKET_BOUNDS = tuple(round(0.1 * 1.25 ** i, 3) for i in range(58))
+REPORTED_PERCENTILES = (50, 90, 95, 99)
+# How many (target, fixture, change) keys are remembered per stage so each
+# change is measured once, on its first persist, serve or publish.
+MAX_TRACKED_CHANGES = 2000
+# Histograms are kept per process; every measurement is also logged with these
+# structured fields so a log-based distribution metric can aggregate across
+# instances.
+LOG_FIELD_STAGE = "freshness_stage"
+LOG_FIELD_LATENCY = "freshness_latency_seconds"
+
+class LatencyHistogram:
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        seconds = max(0.0, seconds)
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # The overflow bucket has no upper bound; the max stands in.
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        summary = {"count": self.count}
+        if self.count:
+            summary["mean_seconds"] = round(self.total / self.count, 3)
+            summary["max_seconds"] = round(self.max, 3)
+            for p in REPORTED_PERCENTILES:
+                summary[f"p{p}_seconds"] = self.percentile(p)
+        return summary
+
+_lock = threading.Lock()
+_histograms = {stage: LatencyHistogram() for stage in STAGES}
+_recorded = {stage: OrderedDict() for stage in STAGES}
+_started_utc = clock.utc_now()
+
+def _record(stage, key, observed_utc, now):
+    try:
+        observed = datetime.fromisoformat(observed_utc)
+    except (TypeError, ValueError):
+        return
+    if observed < _started_utc:
+        # Stamps carried over from before this process started would be
+        # measured at their first sighting here, not when they really landed.
+        return
+    with _lock:
+        recorded = _recorded[stage]
+        if key in recorded:
+            return
+        recorded[key] = True
+        if len(recorded) > MAX_TRACKED_CHANGES:
+            recorded.popitem(last=False)
+        latency = (now - observed).total_seconds()
+        _histograms[stage].record(latency)
+    target, fixture_id, _ = key
+    logger.info(
+        "Freshness: %s after %.3fs (fixture %s).", stage, max(0.0, latency), fixture_id,
+        extra={"json_fields": {LOG_FIELD_STAGE: stage, LOG_FIELD_LATENCY: round(max(0.0, latency), 3),
+                               "fixture_id": fixture_id, "target": target}}
+    )
+
+def record_round(stage, round_data, target=None):
+    # Records, once per target, the delay between each match change carried by
+    # round_data (its changed_utc stamp) and now. `target` tells apart
+    # destinations that each receive the same change, e.g. Reddit posts.
+    now = clock.utc_now()
+    for match in (round_data or {}).get("matches", []):
+        changed_utc = match.get("changed_utc")
+        if changed_utc:
+            _record(stage, (target, match.get("fixture_id"), changed_utc), changed_utc, now)
+
+def reset():
+    # Starts measuring afresh from the current (possibly virtual) time.
+    global _started_utc
+    with _lock:
+        for stage in STAGES:
+            _histograms[stage] = LatencyHistogram()
+            _recorded[stage].clear()
+        _started_utc = clock.utc_now()
+
+def report():
+    # This instance's measurements only; the freshness_* log fields carry the
+    # whole service's view.
+    with _lock:
+        stages = {stage: histogram.summary() for stage, histogram in _histograms.items()}
+    return {"since_utc": _started_utc.isoformat(), "stages": stages}
@@ -0,0 +1,223 @@
+import os
+import logging
+import threading
+from datetime import datetime, timezone
+
+from .api_providers.api_football_api.fetch_standings import fetch_standings_from_api
+from . import clock
+from . import manage_firestore_state
+from . import tick_deadline
+from .team_mappings import MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+COUNTED_STATUSES = {"in_play", "half_time", "completed"}
+LIVE_STATUSES = {"in_play", "half_time"}
+# After a failed base fetch, wait this long before asking the API again.
+BASE_FETCH_RETRY_SECONDS = 600
+
+# The base table is fetched once per round and then only adjusted in memory
+# from the scores in each tick's round data.
+_lock = threading.Lock()
+_state = {
+    "key": None,
+    "failed_key": None,
+    "failed_at": None,
+    "counted_fixture_ids": set(),
+    "contributions": {},
+    "rows": {},
+    "live_teams": set(),
+    "live_table": None
+}
+
+def _standings_doc_path(league_id, season, round_id):
+    safe_round = "".join(c for c in str(round_id) if c.isalnum())
+    return f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/standings/{safe_round}"
+
+def _transform_standings(api_response):
+    rows = []
+    for league_entry in api_response or []:
+        for group in league_entry.get("league", {}).get("standings", []):
+            for entry in group:
+                team_name = entry.get("team", {}).get("name", "N/A")
+                all_matches = entry.get("all", {})
+                goals = all_matches.get("goals", {})
+                rows.append({
+                    "team": team_name,
+                    "team_greek": MAPPINGS["team_to_greek"].get(team_name),
+                    "team_logo": entry.get("team", {}).get("logo"),
+                    "group": entry.get("group"),
+                    "rank": entry.get("rank"),
+                    "points": entry.get("points", 0),
+                    "played": all_matches.get("played", 0),
+                    "won": all_matches.get("win", 0),
+                    "drawn": all_matches.get("draw", 0),
+                    "lost": all_matches.get("lose", 0),
+                    "goals_for": goals.get("for", 0),
+                    "goals_against": goals.get("against", 0),
+                    "goal_difference": entry.get("goalsDiff", 0)
+                })
+    return rows
+
+def _parse_score(score):
+    try:
+        home_goals, away_goals = (int(part.strip()) for part in (score or "").split("-"))
+        return home_goals, away_goals
+    except (ValueError, TypeError):
+        return None
+
+def _match_group(rows, home_team, away_team, round_id):
+    # Rows are keyed by (group, team): in split or post-season phases a team
+    # has a row in several groups. A match counts towards the group holding
+    # both teams, preferring the one named after the round's phase.
+    groups = [g for g, team in rows if team == home_team and (g, away_team) in rows]
+    if len(groups) <= 1:
+        return groups[0] if groups else None
+    phase = str(round_id or "").split(" - ")[0].lower()
+    return next((g for g in groups if phase and phase in str(g or "").lower()), groups[0])
+
+def _contribution(match, rows, round_id):
+    if match.get("status") not in COUNTED_STATUSES:
+        return None
+    goals = _parse_score(match.get("score"))
+    if goals is None:
+        return None
+    group = _match_group(rows, match.get("home_team"), match.get("away_team"), round_id)
+    return (group, match.get("home_team"), match.get("away_team"), goals[0], goals[1])
+
+def _apply(rows, contribution, sign):
+    group, home_team, away_team, home_goals, away_goals = contribution
+    for team, scored, conceded in ((home_team, home_goals, away_goals), (away_team, away_goals, home_goals)):
+        row = rows.get((group, team))
+        if row is None:
+            continue
+        row["played"] += sign
+        row["goals_for"] += sign * scored
+        row["goals_against"] += sign * conceded
+        row["goal_difference"] += sign * (scored - conceded)
+        if scored > conceded:
+            row["won"] += sign
+            row["points"] += sign * 3
+        elif scored == conceded:
+            row["drawn"] += sign
+            row["points"] += sign
+        else:
+            row["lost"] += sign
+
+def _rerank(rows, groups):
+    # Only groups containing a team whose numbers moved are re-sorted.
+    for group in groups:
+        members = [r for r in rows.values() if r.get("group") == group]
+        members.sort(key=lambda r: (-r["points"], -r["goal_difference"], -r["goals_for"], r["team"]))
+        for rank, row in enumerate(members, start=1):
+            row["rank"] = rank
+
+def _build_live_table(rows, live_teams):
+    table = []
+    for row in sorted(rows.values(), key=lambda r: (str(r.get("group") or ""), r["rank"] or 0)):
+        table.append(dict(row, in_play=(row.get("group"), row["team"]) in live_teams))
+    return table
+
+def _load_base(league_id, season, round_data, writes):
+    doc_path = _standings_doc_path(league_id, season, round_data.get("round_id"))
+    cached = manage_firestore_state.get_document_by_path(doc_path)
+    if cached and cached.get("rows"):
+        logger.info("Loaded cached base standings for round '%s'.", round_data.get('round_id'))
+        return cached["rows"], set(cached.get("counted_fixture_ids", []))
+
+    api_response = fetch_standings_from_api(league=league_id, season=season)
+    if not api_response:
+        logger.error("Could not fetch base standings for the live table.")
+        return None, None
+
+    rows = _transform_standings(api_response)
+    # Matches already finished when the table was fetched are already in it.
+    counted_fixture_ids = {
+        m.get("fixture_id") for m in round_data.get("matches", []) if m.get("status") == "completed"
+    }
+    if writes is not None:
+        writes.set_document(doc_path, {
+            "round_id": round_data.get("round_id"),
+            "rows": rows,
+            "counted_fixture_ids": sorted(counted_fixture_ids),
+            "fetched_utc": datetime.now(timezone.utc).isoformat()
+        })
+    logger.info("Fetched base standings (%s teams) for round '%s'.", len(rows), round_data.get('round_id'))
+    return rows, counted_fixture_ids
+
+def update_live_standings(league_id, season, round_data, writes=None):
+    key = (str(league_id), str(season), round_data.get("round_id"))
+    with _lock:
+        if _state["key"] != key:
+            now = clock.utc_now()
+            if _state["failed_key"] == key and (now - _state["failed_at"]).total_seconds() < BASE_FETCH_RETRY_SECONDS:
+                return None
+            if not tick_deadline.allows_low_priority("loading the base standings"):
+                # Not a failure: the next tick with budget to spare loads it.
+                return None
+            base_rows, counted_fixture_ids = _load_base(league_id, season, round_data, writes)
+            if base_rows is None:
+                _state.update(failed_key=key, failed_at=now)
+                return None
+            _state.update(
+                key=key,
+                failed_key=None,
+                counted_fixture_ids=counted_fixture_ids,
+                contributions={},
+                rows={(r.get("group"), r["team"]): dict(r) for r in base_rows},
+                live_teams=set(),
+                live_table=None
+            )
+
+        rows = _state["rows"]
+        changed_groups = set()
+        live_teams = set()
+        for match in round_data.get("matches", []):
+            if match.get("status") in LIVE_STATUSES:
+                group = _match_group(rows, match.get("home_team"), match.get("away_team"), round_data.get("round_id"))
+                live_teams.update(((group, match.get("home_team")), (group, match.get("away_team"))))
+            fixture_id = match.get("fixture_id")
+            if fixture_id in _state["counted_fixture_ids"]:
+                continue
+            new_contribution = _contribution(match, rows, round_data.get("round_id"))
+            old_contribution = _state["contributions"].get(fixture_id)
+            if new_contribution == old_contribution:
+                continue
+            for contribution, sign in ((old_contribution, -1), (new_contribution, 1)):
+                if contribution:
+                    _apply(rows, contribution, sign)
+                    changed_groups.add(contribution[0])
+            _state["contributions"][fixture_id] = new_contribution
+
+        if changed_groups:
+            _rerank(rows, changed_groups)
+        if changed_groups or _state["live_table"] is None or live_teams != _state["live_teams"]:
+            _state["live_table"] = _build_live_table(rows, live_teams)
+            _state["live_teams"] = live_teams
+        return _state["live_table"]
+
+def get_cached_live_table():
+    with _lock:
+        return _state["live_table"]
+
+if __name__ == "__main__":
+    import json
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    EXPORT_DIR = "exports"
+    try:
+        files = sorted([f for f in os.listdir(EXPORT_DIR) if f.startswith("prepared_round_state_") and f.endswith(".json")],
+                       key=lambda f: os.path.getmtime(os.path.join(EXPORT_DIR, f)), reverse=True)
+    except FileNotFoundError:
+        files = []
+
+    if not files:
+        logger.error("No prepared state file found in 'exports/'. Aborting CLI test.")
+    else:
+        with open(os.path.join(EXPORT_DIR, files[0]), 'r', encoding='utf-8') as f:
+            test_round_data = json.load(f)
+        table = update_live_standings(os.getenv("API_FOOTBALL_LEAGUE_ID"), os.getenv("API_FOOTBALL_SEASON"), test_round_data)
+        for row in table or []:
+            print(f"{row['rank']:>2}. {row['team']:<25} {row['played']:>3} {row['goal_difference']:>4} {row['points']:>4}{' *' if row['in_play'] else ''}")
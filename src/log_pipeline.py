@@ -0,0 +1,141 @@
+import os
+import copy
+import queue
+import atexit
+import logging
+import logging.handlers
+import random
+import threading
+
+from . import clock
+
+try:
+    from google.cloud.logging_v2.handlers._helpers import get_request_data
+except ImportError:  # Without Cloud Logging there is no trace to correlate.
+    get_request_data = None
+
+# Pass as `extra=HOT_PATH` on messages logged per request or per upstream
+# call. They are sampled and rate limited; warnings and errors never are.
+HOT_PATH = {"hot_path": True}
+
+# Fraction of hot-path messages kept, and a per-message-template cap on how
+# many of those are emitted per minute.
+LOG_HOT_PATH_SAMPLE_RATE = float(os.getenv("LOG_HOT_PATH_SAMPLE_RATE", "0.1"))
+LOG_HOT_PATH_MAX_PER_MINUTE = int(os.getenv("LOG_HOT_PATH_MAX_PER_MINUTE", "30"))
+# Records beyond this many waiting for the writer thread are dropped rather
+# than blocking the thread that logged them.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# The writer thread reports records dropped on a full queue at most this often.
+LOG_DROPPED_REPORT_INTERVAL_SECONDS = 60
+
+class HotPathFilter(logging.Filter):
+    def __init__(self, sample_rate=LOG_HOT_PATH_SAMPLE_RATE, max_per_minute=LOG_HOT_PATH_MAX_PER_MINUTE):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def filter(self, record):
+        if not getattr(record, "hot_path", False) or record.levelno >= logging.WARNING:
+            return True
+        if random.random() >= self.sample_rate:
+            return False
+        # Keyed on the unformatted template, so messages are never formatted
+        # just to be dropped.
+        key = (record.name, record.msg)
+        minute = int(clock.monotonic() // 60)
+        with self._lock:
+            window_minute, count = self._windows.get(key, (minute, 0))
+            if window_minute != minute:
+                count = 0
+            if count >= self.max_per_minute:
+                return False
+            self._windows[key] = (minute, count + 1)
+        return True
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue, project=None):
+        super().__init__(log_queue)
+        self.project = project
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Runs on the logging thread, while the request context still exists.
+        # Cloud Logging's handler reads these attributes instead of inferring
+        # them on the writer thread, where there is no request.
+        if get_request_data is not None and not hasattr(record, "trace"):
+            http_request, trace_id, span_id, trace_sampled = get_request_data()
+            if trace_id:
+                record.trace = f"projects/{self.project}/traces/{trace_id}" if self.project else trace_id
+                record.span_id = span_id
+                record.trace_sampled = trace_sampled
+            if http_request:
+                record.http_request = http_request
+        # Unlike QueueHandler.prepare, the message is not formatted here: msg
+        # and args travel as they are and the writer thread formats them. Only
+        # a traceback, which holds the request's frames alive, is rendered now.
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = record.exc_text or _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+class _ReportingQueueListener(logging.handlers.QueueListener):
+    # Reports, from the writer thread, how many records the queue handler
+    # dropped since the last report.
+    def __init__(self, log_queue, *handlers, queue_handler=None, respect_handler_level=False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.queue_handler = queue_handler
+        self._reported = 0
+        self._reported_at = clock.monotonic()
+
+    def handle(self, record):
+        super().handle(record)
+        now = clock.monotonic()
+        if now - self._reported_at < LOG_DROPPED_REPORT_INTERVAL_SECONDS:
+            return
+        self._reported_at = now
+        dropped = self.queue_handler.dropped
+        if dropped > self._reported:
+            super().handle(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": "Log queue was full. Dropped %s record(s) (%s in total).",
+                "args": (dropped - self._reported, dropped)
+            }))
+            self._reported = dropped
+
+_exception_formatter = logging.Formatter()
+
+_listener = None
+
+def install_queue_logging(project=None):
+    # Moves the root logger's handlers (Cloud Logging or the local stream)
+    # behind a queue drained by a single background thread, so request threads
+    # only ever pay for an in-memory put.
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    project = project or os.getenv("GOOGLE_CLOUD_PROJECT") or os.getenv("GCP_PROJECT_ID")
+    queue_handler = _DroppingQueueHandler(log_queue, project=project)
+    queue_handler.addFilter(HotPathFilter())
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = _ReportingQueueListener(log_queue, *handlers, queue_handler=queue_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
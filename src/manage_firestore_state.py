@@ -1,103 +1,492 @@
 import os
+import copy
 import logging
 import json
-from datetime import datetime, timezone
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
 from google.cloud import firestore
+from google.api_core.exceptions import FailedPrecondition, NotFound, GoogleAPICallError, RetryError
 from google.cloud.firestore_v1.base_document import DocumentSnapshot
+from google.cloud.firestore_v1.base_query import FieldFilter
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from . import clock
+from . import circuit_breaker
+from .log_pipeline import HOT_PATH
+
 logger = logging.getLogger(__name__)
 
-db = firestore.Client(
-    project=os.getenv("GCP_PROJECT_ID"),
-    database=os.getenv("FIRESTORE_DATABASE_ID")
-)
+class _LazyClient:
+    # Defers creating the Firestore client (and resolving credentials) until
+    # first use, so tools that swap in a local stand-in never need GCP access.
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = firestore.Client(
+                        project=os.getenv("GCP_PROJECT_ID"),
+                        database=os.getenv("FIRESTORE_DATABASE_ID")
+                    )
+        return getattr(self._client, name)
+
+db = _LazyClient()
 
 POINTER_COLLECTION = "system_state"
 POINTER_DOCUMENT = "current_round_pointer"
+# Tick leases live next to the pointer rather than inside it, so the pointer's
+# full-document resets can never clobber a lease that is still held.
+LEASE_DOCUMENT_PREFIX = "current_round_pointer_lease_"
 LEAGUE_COLLECTION = "leagues"
+POST_INDEX_COLLECTION = "reddit_post_index"
+
+def _firestore_available(action):
+    # Claims a call slot on the Firestore circuit; callers must then record the
+    # outcome. While the circuit is open, calls fail fast instead of timing out.
+    if circuit_breaker.get_breaker(circuit_breaker.FIRESTORE).allow_request():
+        return True
+    logger.warning("Firestore circuit is open. Skipping %s.", action)
+    return False
+
+def _record_firestore_outcome(ok):
+    breaker = circuit_breaker.get_breaker(circuit_breaker.FIRESTORE)
+    if ok:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
 
-def get_current_round_pointer():
+def _record_firestore_error(error):
+    # Only errors from talking to Firestore count against its circuit. A bad
+    # path or payload (ValueError, TypeError) is this caller's bug, and must
+    # not fail every other caller fast.
+    _record_firestore_outcome(not isinstance(error, (GoogleAPICallError, RetryError)))
+
+# The pointer changes a few times per round, so reads are served from an
+# in-process copy tagged with the document's update_time. Pointer writes are
+# preconditioned on that update_time: an instance holding a stale copy has
+# its write rejected, drops the copy and fails fast instead of clobbering
+# newer state.
+POINTER_CACHE_TTL_SECONDS = float(os.getenv("POINTER_CACHE_TTL_SECONDS", "30"))
+
+_pointer_cache_lock = threading.Lock()
+_pointer_cache = None  # (pointer data or None if missing, update_time, cached_at monotonic)
+
+def _cache_pointer(data, update_time):
+    global _pointer_cache
+    with _pointer_cache_lock:
+        _pointer_cache = (copy.deepcopy(data), update_time, clock.monotonic())
+
+def invalidate_pointer_cache():
+    global _pointer_cache
+    with _pointer_cache_lock:
+        _pointer_cache = None
+
+def _cached_pointer():
+    with _pointer_cache_lock:
+        return _pointer_cache
+
+def _pointer_write_option(pointer_version):
+    # None when no version is known; the write then goes through unconditionally.
+    if pointer_version is None:
+        return None
+    return db.write_option(last_update_time=pointer_version)
+
+def get_current_round_pointer_with_version(max_age_seconds=POINTER_CACHE_TTL_SECONDS):
+    # Returns (pointer, update_time). max_age_seconds=None trusts the cached
+    # copy however old. Only callers whose pointer writes go through a
+    # TickWrites begun with that update_time may do that: the precondition
+    # catches a stale copy there.
+    cached = _cached_pointer()
+    if cached is not None and (max_age_seconds is None or clock.monotonic() - cached[2] < max_age_seconds):
+        return copy.deepcopy(cached[0]), cached[1]
+
+    if not _firestore_available("current round pointer read"):
+        return None, None
     try:
         doc_ref = db.collection(POINTER_COLLECTION).document(POINTER_DOCUMENT)
         doc = doc_ref.get()
+        _record_firestore_outcome(True)
         if doc.exists:
-            logger.info(f"Successfully retrieved current round pointer.")
-            return doc.to_dict()
+            logger.info("Successfully retrieved current round pointer.", extra=HOT_PATH)
+            pointer = doc.to_dict()
+            _cache_pointer(pointer, doc.update_time)
+            return pointer, doc.update_time
         else:
             logger.warning("Current round pointer document does not exist.")
-            return None
+            _cache_pointer(None, None)
+            return None, None
     except Exception as e:
-        logger.error(f"Failed to get current round pointer from Firestore: {e}")
-        return None
+        _record_firestore_error(e)
+        logger.error("Failed to get current round pointer from Firestore: %s", e)
+        return None, None
 
-def set_current_round_pointer(document_path, round_id):
-    try:
-        doc_ref = db.collection(POINTER_COLLECTION).document(POINTER_DOCUMENT)
-        doc_ref.set({
-            "document_path": document_path,
-            "round_id": round_id,
-            "reddit_post_id": None,
-            "reddit_post_finalized": False,
-            "last_updated_utc": datetime.now(timezone.utc).isoformat()
-        })
-        logger.info(f"Successfully set/reset current round pointer for path: {document_path}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to set current round pointer in Firestore: {e}")
-        return False
+def get_current_round_pointer(max_age_seconds=POINTER_CACHE_TTL_SECONDS):
+    return get_current_round_pointer_with_version(max_age_seconds)[0]
 
-def update_pointer_with_reddit_details(post_id=None, is_finalized=None):
-    update_data = {"last_updated_utc": datetime.now(timezone.utc).isoformat()}
-    log_messages = []
+def _pointer_payload(document_path, round_id):
+    return {
+        "document_path": document_path,
+        "round_id": round_id,
+        "reddit_post_id": None,
+        "reddit_post_ids": {},
+        "reddit_post_finalized": False,
+        "reddit_pending_edits": {},
+        "last_updated_utc": clock.utc_now().isoformat()
+    }
 
+def _reddit_details_payload(post_id=None, is_finalized=None, post_ids=None, pending_edits=None):
+    update_data = {}
     if post_id is not None:
         update_data["reddit_post_id"] = post_id
-        log_messages.append(f"reddit_post_id={post_id}")
-
+    if post_ids is not None:
+        update_data["reddit_post_ids"] = dict(post_ids)
     if is_finalized is not None:
         update_data["reddit_post_finalized"] = is_finalized
-        log_messages.append(f"reddit_post_finalized={is_finalized}")
+    if pending_edits is not None:
+        update_data["reddit_pending_edits"] = dict(pending_edits)
+    return update_data
 
-    if not log_messages:
+def set_current_round_pointer(document_path, round_id):
+    try:
+        doc_ref = db.collection(POINTER_COLLECTION).document(POINTER_DOCUMENT)
+        doc_ref.set(_pointer_payload(document_path, round_id))
+        invalidate_pointer_cache()
+        logger.info("Successfully set/reset current round pointer for path: %s", document_path)
+        return True
+    except Exception as e:
+        logger.error("Failed to set current round pointer in Firestore: %s", e)
+        return False
+
+def update_pointer_with_reddit_details(post_id=None, is_finalized=None, post_ids=None, pending_edits=None):
+    update_data = _reddit_details_payload(post_id, is_finalized, post_ids, pending_edits)
+    if not update_data:
         logger.warning("update_pointer_with_reddit_details called without any data to update.")
         return True
 
+    log_message = ", ".join(f"{k}={v}" for k, v in update_data.items())
+    update_data["last_updated_utc"] = clock.utc_now().isoformat()
+
     try:
         doc_ref = db.collection(POINTER_COLLECTION).document(POINTER_DOCUMENT)
         doc_ref.update(update_data)
-        logger.info(f"Successfully updated pointer with: {', '.join(log_messages)}")
+        invalidate_pointer_cache()
+        logger.info("Successfully updated pointer with: %s", log_message)
         return True
     except Exception as e:
-        logger.error(f"Failed to update pointer with Reddit details: {e}")
+        logger.error("Failed to update pointer with Reddit details: %s", e)
         return False
 
 def get_round_data_by_path(document_path):
+    return get_document_by_path(document_path)
+
+def get_document_by_path(document_path):
+    if not _firestore_available(f"read of {document_path}"):
+        return None
     try:
         doc_ref = db.document(document_path)
         doc = doc_ref.get()
+        _record_firestore_outcome(True)
         if doc.exists:
-            logger.info(f"Successfully retrieved data for document: {document_path}")
+            logger.info("Successfully retrieved data for document: %s", document_path, extra=HOT_PATH)
             return doc.to_dict()
         else:
-            logger.warning(f"Document does not exist at path: {document_path}")
+            logger.warning("Document does not exist at path: %s", document_path)
             return None
     except Exception as e:
-        logger.error(f"Failed to get document from Firestore at path {document_path}: {e}")
+        _record_firestore_error(e)
+        logger.error("Failed to get document from Firestore at path %s: %s", document_path, e)
         return None
 
 def set_round_data(document_path, data):
+    if not _firestore_available(f"write of {document_path}"):
+        return False
     try:
         doc_ref = db.document(document_path)
         doc_ref.set(data)
-        logger.info(f"Successfully set data for document: {document_path}")
+        _record_firestore_outcome(True)
+        logger.info("Successfully set data for document: %s", document_path)
+        return True
+    except Exception as e:
+        _record_firestore_error(e)
+        logger.error("Failed to set document in Firestore at path %s: %s", document_path, e)
+        return False
+
+def _lease_ref(lease_key):
+    return db.collection(POINTER_COLLECTION).document(f"{LEASE_DOCUMENT_PREFIX}{lease_key}")
+
+def acquire_tick_lease(lease_key, holder_id, ttl_seconds):
+    # Returns True when the lease was taken, False when another holder owns an
+    # unexpired lease, and None if Firestore could not be reached.
+    doc_ref = _lease_ref(lease_key)
+
+    @firestore.transactional
+    def _acquire(transaction):
+        now = clock.utc_now()
+        snapshot = doc_ref.get(transaction=transaction)
+        if snapshot.exists:
+            lease = snapshot.to_dict()
+            try:
+                expires_utc = datetime.fromisoformat(lease.get("expires_utc"))
+            except (TypeError, ValueError):
+                expires_utc = now
+            if lease.get("holder_id") != holder_id and expires_utc > now:
+                logger.info("Tick lease '%s' is held by %s until %s.", lease_key, lease.get('holder_id'), expires_utc.isoformat())
+                return False
+        transaction.set(doc_ref, {
+            "holder_id": holder_id,
+            "acquired_utc": now.isoformat(),
+            "expires_utc": (now + timedelta(seconds=ttl_seconds)).isoformat()
+        })
         return True
+
+    if not _firestore_available(f"acquire of tick lease '{lease_key}'"):
+        return None
+    try:
+        acquired = _acquire(db.transaction())
+        _record_firestore_outcome(True)
+        if acquired:
+            logger.info("Acquired tick lease '%s' as %s for %ss.", lease_key, holder_id, ttl_seconds)
+        return acquired
     except Exception as e:
-        logger.error(f"Failed to set document in Firestore at path {document_path}: {e}")
+        _record_firestore_error(e)
+        logger.error("Failed to acquire tick lease '%s' in Firestore: %s", lease_key, e)
+        return None
+
+def release_tick_lease(lease_key, holder_id):
+    doc_ref = _lease_ref(lease_key)
+
+    @firestore.transactional
+    def _release(transaction):
+        snapshot = doc_ref.get(transaction=transaction)
+        if snapshot.exists and snapshot.to_dict().get("holder_id") == holder_id:
+            transaction.delete(doc_ref)
+            return True
         return False
 
+    try:
+        if _release(db.transaction()):
+            logger.info("Released tick lease '%s' held by %s.", lease_key, holder_id)
+        else:
+            logger.warning("Tick lease '%s' was no longer held by %s at release.", lease_key, holder_id)
+        return True
+    except Exception as e:
+        logger.error("Failed to release tick lease '%s' in Firestore: %s", lease_key, e)
+        return False
+
+def _post_index_ref(league_id, season, round_title, subreddit):
+    # Titles and subreddit names may contain characters Firestore does not
+    # allow in document ids, so the index is keyed on a digest of the tuple.
+    raw_key = f"{league_id}|{season}|{subreddit.lower()}|{round_title}"
+    return db.collection(POST_INDEX_COLLECTION).document(hashlib.sha1(raw_key.encode("utf-8")).hexdigest())
+
+def get_collection_documents(collection_path, updated_after=None):
+    # Returns {document_id: data} for every document in the collection, or
+    # only those whose last_updated_utc is later than updated_after, or None
+    # if it could not be read.
+    if not _firestore_available(f"read of {collection_path}"):
+        return None
+    try:
+        query = db.collection(collection_path)
+        if updated_after is not None:
+            query = query.where(filter=FieldFilter("last_updated_utc", ">", updated_after))
+        documents = {doc.id: doc.to_dict() for doc in query.stream()}
+        _record_firestore_outcome(True)
+        logger.info("Retrieved %s document(s) from collection: %s", len(documents), collection_path)
+        return documents
+    except Exception as e:
+        _record_firestore_error(e)
+        logger.error("Failed to read collection %s from Firestore: %s", collection_path, e)
+        return None
+
+def get_indexed_post_id(league_id, season, round_title, subreddit):
+    try:
+        doc = _post_index_ref(league_id, season, round_title, subreddit).get()
+        if doc.exists:
+            return doc.to_dict().get("post_id")
+        return None
+    except Exception as e:
+        logger.error("Failed to read Reddit post index for '%s' in r/%s: %s", round_title, subreddit, e)
+        return None
+
+def index_post_id(league_id, season, round_title, subreddit, post_id, source="created"):
+    try:
+        _post_index_ref(league_id, season, round_title, subreddit).set({
+            "league_id": str(league_id),
+            "season": str(season),
+            "round_title": round_title,
+            "subreddit": subreddit,
+            "post_id": post_id,
+            "source": source,
+            "indexed_utc": clock.utc_now().isoformat()
+        })
+        logger.info("Indexed Reddit post %s for '%s' in r/%s (%s).", post_id, round_title, subreddit, source)
+        return True
+    except Exception as e:
+        logger.error("Failed to index Reddit post %s for '%s': %s", post_id, round_title, e)
+        return False
+
+def _post_index_backfill_ref(league_id, season, subreddit):
+    return db.collection(POST_INDEX_COLLECTION).document(
+        hashlib.sha1(f"{league_id}|{season}|{subreddit.lower()}|backfilled".encode("utf-8")).hexdigest()
+    )
+
+def is_post_index_backfilled(league_id, season, subreddit):
+    # None if the marker could not be read.
+    try:
+        return _post_index_backfill_ref(league_id, season, subreddit).get().exists
+    except Exception as e:
+        logger.error("Failed to read Reddit post index backfill marker for r/%s: %s", subreddit, e)
+        return None
+
+def mark_post_index_backfilled(league_id, season, subreddit, indexed_count):
+    try:
+        _post_index_backfill_ref(league_id, season, subreddit).set({
+            "league_id": str(league_id),
+            "season": str(season),
+            "subreddit": subreddit,
+            "indexed_count": indexed_count,
+            "backfilled_utc": clock.utc_now().isoformat()
+        })
+        return True
+    except Exception as e:
+        logger.error("Failed to mark Reddit post index backfilled for r/%s: %s", subreddit, e)
+        return False
+
+# Firestore rejects batches with more operations than this.
+FIRESTORE_BATCH_LIMIT = 500
+
+def set_documents(documents, merge=False):
+    # Writes {document_path: data} in as few batched commits as Firestore
+    # allows; with merge=True only the given fields are replaced. Returns the
+    # number of documents written before any failure.
+    written = 0
+    items = list(documents.items())
+    for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+        chunk = items[start:start + FIRESTORE_BATCH_LIMIT]
+        if not _firestore_available(f"batched write of {len(chunk)} document(s)"):
+            return written
+        batch = db.batch()
+        for document_path, data in chunk:
+            batch.set(db.document(document_path), data, merge=merge)
+        try:
+            batch.commit()
+            _record_firestore_outcome(True)
+        except Exception as e:
+            _record_firestore_error(e)
+            logger.error("Failed to commit batched write of %s document(s) to Firestore: %s", len(chunk), e)
+            return written
+        written += len(chunk)
+        logger.info("Committed batched write of %s document(s).", len(chunk))
+    return written
+
+class TickWrites:
+    # Collects one orchestration tick's pointer and round mutations and commits
+    # them in a single atomic WriteBatch. Mutations to the same document are
+    # folded together so every document is written at most once per commit.
+    # Pointer writes are preconditioned on pointer_version, the update_time of
+    # the copy the tick read, never on whatever the shared cache holds by then.
+    def __init__(self, pointer_version=None):
+        self._pointer_version = pointer_version
+        self._pointer_set = None
+        self._pointer_update = {}
+        self._documents = {}
+
+    def set_current_round_pointer(self, document_path, round_id):
+        self._pointer_set = _pointer_payload(document_path, round_id)
+        self._pointer_update = {}
+
+    def update_pointer_with_reddit_details(self, post_id=None, is_finalized=None, post_ids=None, pending_edits=None):
+        update_data = _reddit_details_payload(post_id, is_finalized, post_ids, pending_edits)
+        if not update_data:
+            logger.warning("update_pointer_with_reddit_details called without any data to update.")
+            return
+        update_data["last_updated_utc"] = clock.utc_now().isoformat()
+        if self._pointer_set is not None:
+            self._pointer_set.update(update_data)
+        else:
+            self._pointer_update.update(update_data)
+
+    def set_round_data(self, document_path, data):
+        self.set_document(document_path, data)
+
+    def set_document(self, document_path, data):
+        self._documents[document_path] = data
+
+    def has_pending_writes(self):
+        return bool(self._pointer_set is not None or self._pointer_update or self._documents)
+
+    def commit(self):
+        if not self.has_pending_writes():
+            return True
+
+        batch = db.batch()
+        pointer_ref = db.collection(POINTER_COLLECTION).document(POINTER_DOCUMENT)
+        pointer_option = _pointer_write_option(self._pointer_version)
+        if self._pointer_set is not None:
+            # A batched set takes no precondition; updating every pointer field
+            # replaces the document just the same.
+            if pointer_option is not None:
+                batch.update(pointer_ref, self._pointer_set, option=pointer_option)
+            else:
+                batch.set(pointer_ref, self._pointer_set)
+        elif self._pointer_update:
+            batch.update(pointer_ref, self._pointer_update, option=pointer_option)
+        for document_path, data in self._documents.items():
+            batch.set(db.document(document_path), data)
+
+        if not _firestore_available("tick writes commit"):
+            return False
+        try:
+            write_results = batch.commit()
+            _record_firestore_outcome(True)
+            logger.info("Successfully committed tick writes for %s document(s) and the pointer.", len(self._documents))
+        except (FailedPrecondition, NotFound) as e:
+            # Firestore answered: another instance moved the pointer since it
+            # was cached. Nothing in the batch was applied.
+            _record_firestore_outcome(True)
+            invalidate_pointer_cache()
+            logger.warning("Current round pointer changed underneath this tick. Dropped the cached copy; failing fast: %s", e)
+            return False
+        except Exception as e:
+            _record_firestore_error(e)
+            logger.error("Failed to commit tick writes to Firestore: %s", e)
+            return False
+
+        self._remember_pointer(write_results)
+        self._pointer_set = None
+        self._pointer_update = {}
+        self._documents = {}
+        return True
+
+    def _remember_pointer(self, write_results):
+        # The pointer is the batch's first write; its result carries the new
+        # update_time, so the next tick needs no read to stay current.
+        if self._pointer_set is None and not self._pointer_update:
+            return
+        update_time = getattr(write_results[0], "update_time", None) if write_results else None
+        cached = _cached_pointer()
+        if self._pointer_set is not None:
+            pointer = self._pointer_set
+        elif cached is not None and cached[0] is not None and cached[1] == self._pointer_version:
+            # Only the copy this tick's precondition held on can be patched.
+            pointer = dict(cached[0], **self._pointer_update)
+        else:
+            pointer = None
+        self._pointer_version = update_time
+        if pointer is None or update_time is None:
+            invalidate_pointer_cache()
+            return
+        _cache_pointer(pointer, update_time)
+
+def begin_tick_writes(pointer_version=None):
+    return TickWrites(pointer_version=pointer_version)
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -119,14 +508,14 @@ if __name__ == "__main__":
             if files:
                 latest_file_path = os.path.join(EXPORT_DIR, files[0])
         except FileNotFoundError:
-            logger.warning(f"Export directory '{EXPORT_DIR}' not found. Cannot test set_round_data.")
+            logger.warning("Export directory '%s' not found. Cannot test set_round_data.", EXPORT_DIR)
 
         if not latest_file_path:
             logger.warning("No consolidated data file found. Test will be partial.")
             test_round_data = None
             test_round_id = "test_round_cli"
         else:
-            logger.info(f"Using latest consolidated file for test: {latest_file_path}")
+            logger.info("Using latest consolidated file for test: %s", latest_file_path)
             with open(latest_file_path, 'r', encoding='utf-8') as f:
                 test_round_data = json.load(f)
             test_round_id = test_round_data.get("round_id", "unknown_round")
@@ -134,33 +523,33 @@ if __name__ == "__main__":
         test_doc_path = f"{LEAGUE_COLLECTION}/{TEST_LEAGUE}/seasons/{TEST_SEASON}/rounds/{test_round_id}"
 
         if test_round_data:
-            logger.info(f"\n1. Attempting to WRITE round data to: {test_doc_path}")
+            logger.info("\n1. Attempting to WRITE round data to: %s", test_doc_path)
             if set_round_data(test_doc_path, test_round_data): logger.info("WRITE successful.")
             else: logger.error("WRITE failed.")
         
-        logger.info(f"\n2. Attempting to READ round data from: {test_doc_path}")
+        logger.info("\n2. Attempting to READ round data from: %s", test_doc_path)
         retrieved_data = get_round_data_by_path(test_doc_path)
         if retrieved_data: logger.info("READ successful.")
         else: logger.error("READ failed.")
 
-        logger.info(f"\n3. Attempting to SET/RESET pointer to: {test_doc_path}")
+        logger.info("\n3. Attempting to SET/RESET pointer to: %s", test_doc_path)
         if set_current_round_pointer(test_doc_path, test_round_id): logger.info("Pointer SET successful.")
         else: logger.error("Pointer SET failed.")
             
-        logger.info(f"\n4. Attempting to READ pointer.")
+        logger.info("\n4. Attempting to READ pointer.")
         retrieved_pointer = get_current_round_pointer()
-        if retrieved_pointer: logger.info(f"Pointer READ successful: {retrieved_pointer}")
+        if retrieved_pointer: logger.info("Pointer READ successful: %s", retrieved_pointer)
         else: logger.error("Pointer READ failed.")
         
-        logger.info(f"\n5. Attempting to UPDATE pointer with Reddit Post ID.")
+        logger.info("\n5. Attempting to UPDATE pointer with Reddit Post ID.")
         if update_pointer_with_reddit_details(post_id="t3_test123"): logger.info("Pointer UPDATE successful.")
         else: logger.error("Pointer UPDATE failed.")
 
-        logger.info(f"\n6. Attempting to READ pointer again to verify update.")
+        logger.info("\n6. Attempting to READ pointer again to verify update.")
         retrieved_pointer = get_current_round_pointer()
         if retrieved_pointer and retrieved_pointer.get("reddit_post_id") == "t3_test123":
-            logger.info(f"Pointer READ successful and ID is correct: {retrieved_pointer}")
+            logger.info("Pointer READ successful and ID is correct: %s", retrieved_pointer)
         else:
-            logger.error(f"Pointer READ failed or ID was incorrect: {retrieved_pointer}")
+            logger.error("Pointer READ failed or ID was incorrect: %s", retrieved_pointer)
 
         logger.info("\n--- CLI Test Complete ---")
\ No newline at end of file
@@ -1,88 +1,231 @@
 import os
+import uuid
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 
+from . import clock
+from . import circuit_breaker
 from . import prepare_current_round_state
 from . import analyze_round_state
+from . import detect_round_events
 from . import manage_firestore_state
 from . import schedule_next_run
+from . import season_calendar
+from . import distribute_to_subreddits
 from . import distribute_to_reddit
+from . import live_standings
+from . import match_events
+from . import season_archive
+from . import snapshot_store
+from . import freshness
+from . import tick_deadline
 
 logger = logging.getLogger(__name__)
 
 LEAGUE_ID = os.getenv("API_FOOTBALL_LEAGUE_ID")
 SEASON = os.getenv("API_FOOTBALL_SEASON")
 HOURS_BEFORE_KICKOFF_TO_POST = 1
+TICK_LEASE_TTL_SECONDS = int(os.getenv("TICK_LEASE_TTL_SECONDS", "180"))
+# Round events that skip the regular Reddit edit interval.
+URGENT_PUBLISH_EVENT_TYPES = {
+    detect_round_events.GOAL, detect_round_events.SCORE_CORRECTION,
+    detect_round_events.FULL_TIME, detect_round_events.POSTPONED
+}
+
+# Ticks currently running in this process, keyed by league. Concurrent callers
+# for the same league wait on the in-flight tick instead of starting their own.
+_inflight_lock = threading.Lock()
+_inflight_ticks = {}
+
+class _InflightTick:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
 
 def run_orchestration_logic():
-    logger.info("--- Starting Orchestration Logic ---")
-    
     if not LEAGUE_ID or not SEASON:
         logger.critical("API_FOOTBALL_LEAGUE_ID and/or API_FOOTBALL_SEASON not set. Halting.")
         return False
 
+    with _inflight_lock:
+        inflight = _inflight_ticks.get(LEAGUE_ID)
+        is_owner = inflight is None
+        if is_owner:
+            inflight = _InflightTick()
+            _inflight_ticks[LEAGUE_ID] = inflight
+
+    if not is_owner:
+        logger.info("A tick for league %s is already running in this instance. Waiting for its result.", LEAGUE_ID)
+        if not inflight.done.wait(timeout=TICK_LEASE_TTL_SECONDS):
+            logger.warning("Timed out waiting for the in-flight tick. It will schedule the next run itself.")
+            return True
+        return inflight.result
+
+    try:
+        with tick_deadline.start():
+            inflight.result = _run_with_tick_lease()
+        return inflight.result
+    finally:
+        with _inflight_lock:
+            _inflight_ticks.pop(LEAGUE_ID, None)
+        inflight.done.set()
+
+def _run_with_tick_lease():
+    holder_id = uuid.uuid4().hex
+    acquired = manage_firestore_state.acquire_tick_lease(LEAGUE_ID, holder_id, TICK_LEASE_TTL_SECONDS)
+    if acquired is None:
+        return False
+    if not acquired:
+        # Another instance is running this tick and will schedule the next one.
+        logger.info("Tick for league %s is already running on another instance. Coalescing.", LEAGUE_ID)
+        return True
+
+    try:
+        return _run_orchestration_tick()
+    finally:
+        manage_firestore_state.release_tick_lease(LEAGUE_ID, holder_id)
+
+def _schedule_from_calendar(target_url):
+    wake = season_calendar.next_wake_time(LEAGUE_ID, SEASON, lead_hours=HOURS_BEFORE_KICKOFF_TO_POST)
+    if wake is None:
+        logger.warning("Season calendar unavailable. Scheduling check for tomorrow.")
+        return schedule_next_run.schedule_next_run(clock.utc_now() + timedelta(days=1), target_url) # No round_id needed
+    wake_time, entry = wake
+    # Naming the task after the round it wakes for keeps repeated scheduling idempotent.
+    round_id = f"calendar {entry['round_id']}" if entry else "calendar refresh"
+    return schedule_next_run.schedule_next_run(wake_time, target_url, round_id=round_id)
+
+def _run_orchestration_tick():
+    logger.info("--- Starting Orchestration Logic ---")
+
     # Step 1: Always get the latest state from the API
     new_round_data = prepare_current_round_state.prepare_current_round_state(
         league_id=LEAGUE_ID,
         season=SEASON
     )
     if not new_round_data:
-        logger.warning("Failed to prepare new round state. Possibly end of season. Scheduling check for tomorrow.")
-        next_run = datetime.now(timezone.utc) + timedelta(days=1)
-        target_url = os.getenv("CLOUD_RUN_SERVICE_URL")
-        schedule_next_run.schedule_next_run(next_run, target_url) # No round_id needed
+        if circuit_breaker.is_open(circuit_breaker.API_FOOTBALL):
+            # An outage, not a break: fail fast and let the task queue retry.
+            logger.error("API Football circuit is open. Skipping this tick.")
+            return False
+        logger.warning("Failed to prepare new round state. Possibly a break or end of season.")
+        _schedule_from_calendar(os.getenv("CLOUD_RUN_SERVICE_URL"))
         return True
 
     current_round_id = new_round_data.get("round_id")
+    if snapshot_store.is_enabled():
+        snapshot_store.put(snapshot_store.ROUND, new_round_data, key=current_round_id)
     round_doc_path = f"leagues/{LEAGUE_ID}/seasons/{SEASON}/rounds/{current_round_id}"
 
     # Step 2: Check our system's memory (Firestore)
-    pointer_data = manage_firestore_state.get_current_round_pointer()
+    # Pointer writes are preconditioned on the version of the copy read here,
+    # so the tick can trust the cached copy however old and skip the read. A
+    # stale copy fails the commit, drops the cache and the retried tick rereads.
+    pointer_data, pointer_version = manage_firestore_state.get_current_round_pointer_with_version(max_age_seconds=None)
+    writes = manage_firestore_state.begin_tick_writes(pointer_version=pointer_version)
 
     # Step 3: If the round has changed, reset our system's memory
     if not pointer_data or pointer_data.get("round_id") != current_round_id:
-        logger.info(f"New round detected ({current_round_id}). Resetting pointer.")
-        if not manage_firestore_state.set_current_round_pointer(round_doc_path, current_round_id):
-            return False
+        logger.info("New round detected (%s). Resetting pointer.", current_round_id)
+        writes.set_current_round_pointer(round_doc_path, current_round_id)
         pointer_data = {"round_id": current_round_id, "reddit_post_id": None, "reddit_post_finalized": False}
 
-    # Step 4: Run the analysis and update data
+    # Step 4: Run the analysis, detect what changed since the last snapshot and stage the updated data
     analysis = analyze_round_state.analyze_round_state(new_round_data)
     if not analysis: return False
-    
-    if not manage_firestore_state.set_round_data(round_doc_path, new_round_data): return False
+
+    events = detect_round_events.detect_events(round_doc_path, new_round_data)
+    detect_round_events.stage_event_log(writes, round_doc_path, events)
+    match_events.update_match_events(LEAGUE_ID, SEASON, new_round_data, events, writes)
+
+    # The live table is projected from this tick's scores against a base table
+    # fetched once per round, and travels with the round document.
+    live_table = live_standings.update_live_standings(LEAGUE_ID, SEASON, new_round_data, writes)
+    if live_table:
+        new_round_data["standings"] = live_table
+
+    writes.set_round_data(round_doc_path, new_round_data)
 
     # Step 5: Execute Reddit logic based on current state and memory
     round_state = analysis.get("round_state")
-    reddit_post_id = pointer_data.get("reddit_post_id")
     reddit_post_finalized = pointer_data.get("reddit_post_finalized", False)
-
-    logger.info(f"Processing Round: {current_round_id}. State: {round_state}. Reddit Post ID: {reddit_post_id}")
-
-    if not reddit_post_id and round_state in ["not_started", "in_play", "partially_completed"]:
-        should_create = (round_state != "not_started") or (
+    reddit_post_ids = dict(pointer_data.get("reddit_post_ids") or {})
+    primary_subreddit = distribute_to_subreddits.get_primary_subreddit()
+    if pointer_data.get("reddit_post_id") and primary_subreddit and primary_subreddit not in reddit_post_ids:
+        # Pointers written before multi-subreddit distribution only hold the primary post.
+        reddit_post_ids[primary_subreddit] = pointer_data["reddit_post_id"]
+    reddit_ok = True
+
+    # Edits queued by an earlier tick, possibly on another instance, that had
+    # not been published yet. They resume with this tick's body.
+    for post_id, urgent in (pointer_data.get("reddit_pending_edits") or {}).items():
+        if post_id in reddit_post_ids.values():
+            distribute_to_reddit.enqueue_update(post_id, new_round_data, urgent=urgent)
+
+    logger.info("Processing Round: %s. State: %s. Reddit Post IDs: %s", current_round_id, round_state, reddit_post_ids)
+
+    create_missing = round_state in ["not_started", "in_play", "partially_completed"] and (
+        (round_state != "not_started") or (
             analysis.get("next_run_timestamp") and
-            datetime.fromisoformat(analysis["next_run_timestamp"]) - datetime.now(timezone.utc) <= timedelta(hours=HOURS_BEFORE_KICKOFF_TO_POST)
+            datetime.fromisoformat(analysis["next_run_timestamp"]) - clock.utc_now() <= timedelta(hours=HOURS_BEFORE_KICKOFF_TO_POST)
+        )
+    )
+    if create_missing and not tick_deadline.allows_low_priority("creating Reddit threads"):
+        # Thread creation is re-evaluated on every tick; edits are only queued and stay cheap.
+        create_missing = False
+    is_final_update = round_state == "completed" and not reddit_post_finalized
+    # In play, the thread is only edited when the snapshot actually changed.
+    update_existing = (round_state == "in_play" and bool(events)) or is_final_update
+
+    if create_missing or (update_existing and reddit_post_ids):
+        logger.info("Distributing round to Reddit (create_missing=%s, update_existing=%s).", create_missing, update_existing)
+        outcome = distribute_to_subreddits.distribute_round(
+            new_round_data, reddit_post_ids, create_missing, update_existing,
+            league_id=LEAGUE_ID, season=SEASON,
+            urgent=is_final_update or any(e["type"] in URGENT_PUBLISH_EVENT_TYPES for e in events),
+            confirm=is_final_update
         )
-        if should_create:
-            logger.info(f"Conditions met to create Reddit post.")
-            new_post_id = distribute_to_reddit.create_or_get_post(new_round_data)
-            if not new_post_id: return False
-            if not manage_firestore_state.update_pointer_with_reddit_details(post_id=new_post_id): return False
-            reddit_post_id = new_post_id
-    
-    elif reddit_post_id and round_state == "in_play":
-        logger.info("Round is in play. Updating Reddit post.")
-        if not distribute_to_reddit.update_post(reddit_post_id, new_round_data): return False
-
-    elif reddit_post_id and round_state == "completed" and not reddit_post_finalized:
-        logger.info("Round is complete. Performing final update on Reddit post.")
-        if not distribute_to_reddit.update_post(reddit_post_id, new_round_data): return False
-        if not manage_firestore_state.update_pointer_with_reddit_details(is_finalized=True): return False
-
-    if round_state == "completed":
-        logger.info(f"Round {current_round_id} is complete. Marking pointer for discovery on next run.")
-        if not manage_firestore_state.set_current_round_pointer("completed", current_round_id): return False
+        if outcome["post_ids"] != reddit_post_ids:
+            writes.update_pointer_with_reddit_details(
+                post_id=outcome["post_ids"].get(primary_subreddit), post_ids=outcome["post_ids"]
+            )
+            reddit_post_ids = outcome["post_ids"]
+
+        if is_final_update:
+            # The round may only be marked final once every thread shows full time.
+            reddit_ok = not outcome["pending"]
+            if reddit_ok:
+                writes.update_pointer_with_reddit_details(is_finalized=True)
+        else:
+            # Failed targets stay queued for retry; the tick only fails if nothing got through.
+            reddit_ok = bool(outcome["succeeded"]) or not outcome["pending"]
+
+    # The in-memory publish queue does not survive CPU throttling between
+    # requests or the instance being recycled. Publish what is due while this
+    # request still runs, and record the rest for the next tick.
+    if tick_deadline.allows_low_priority("publishing due Reddit edits"):
+        distribute_to_reddit.publish_due_edits()
+    pending_edits = {
+        post_id: urgent for post_id, urgent in distribute_to_reddit.queued_edits().items()
+        if post_id in reddit_post_ids.values()
+    }
+    if pending_edits != (pointer_data.get("reddit_pending_edits") or {}):
+        writes.update_pointer_with_reddit_details(pending_edits=pending_edits)
+
+    if round_state == "completed" and reddit_ok:
+        logger.info("Round %s is complete. Marking pointer for discovery on next run.", current_round_id)
+        writes.set_current_round_pointer("completed", current_round_id)
+        season_archive.archive_round(LEAGUE_ID, SEASON, new_round_data)
+
+    # All of this tick's state changes land atomically in one commit.
+    if not writes.commit(): return False
+    # Only a committed snapshot becomes the baseline for the next diff, so a
+    # failed tick re-emits its events on retry.
+    detect_round_events.remember_snapshot(round_doc_path, new_round_data)
+    freshness.record_round(freshness.PERSISTED, new_round_data)
+    detect_round_events.publish(events)
+    if not reddit_ok: return False
 
     # Step 6: Schedule the next run
     target_url = os.getenv("CLOUD_RUN_SERVICE_URL")
@@ -91,8 +234,11 @@ def run_orchestration_logic():
         return False
 
     next_run_dt = datetime.fromisoformat(analysis["next_run_timestamp"]) if analysis.get("next_run_timestamp") else None
-    
-    if not schedule_next_run.schedule_next_run(next_run_dt, target_url, round_id=current_round_id): 
+
+    if next_run_dt is None and round_state == "completed":
+        # The round is done; sleep until the next round's window opens.
+        if not _schedule_from_calendar(target_url): return False
+    elif not schedule_next_run.schedule_next_run(next_run_dt, target_url, round_id=current_round_id): 
         return False
 
     logger.info("--- Orchestration Logic Completed Successfully ---")
@@ -0,0 +1,136 @@
+import os
+import logging
+import threading
+
+from . import clock
+from . import manage_firestore_state
+from . import detect_round_events
+from . import tick_deadline
+from .api_providers.api_football_api.fetch_fixture_events import fetch_fixture_events_from_api
+
+logger = logging.getLogger(__name__)
+
+# Round events that can change a match's scorers, cards or substitutions.
+FETCH_TRIGGER_EVENT_TYPES = {
+    detect_round_events.KICKOFF, detect_round_events.GOAL, detect_round_events.SCORE_CORRECTION,
+    detect_round_events.HALF_TIME, detect_round_events.SECOND_HALF, detect_round_events.FULL_TIME
+}
+TRACKED_STATUSES = {"in_play", "half_time", "completed"}
+MAX_EVENT_FETCHES_PER_TICK = int(os.getenv("MAX_EVENT_FETCHES_PER_TICK", "4"))
+# The events feed often lags the score. A fetch whose goals do not add up to
+# the score leaves the cursor behind so the next tick fetches again, up to
+# this many times before the feed is taken as it is.
+MAX_LAGGING_FETCHES = 10
+
+# fixture_id -> cursor: the compact events plus the score and status they were
+# fetched at. A cursor marked final (match completed) is never fetched again.
+_lock = threading.Lock()
+_cursors = {}
+
+def _cursor_doc_path(league_id, season, fixture_id):
+    return f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/fixture_events/{fixture_id}"
+
+def _transform_events(api_events, match):
+    events = []
+    for item in api_events or []:
+        event_type, detail = item.get("type"), item.get("detail") or ""
+        if event_type == "Goal" and detail != "Missed Penalty":
+            kind = "goal"
+        elif event_type == "Card" and detail == "Red Card":
+            kind = "red_card"
+        elif event_type == "subst":
+            kind = "substitution"
+        else:
+            continue
+        team_name = item.get("team", {}).get("name")
+        events.append({
+            "type": kind,
+            "detail": detail,
+            "minute": item.get("time", {}).get("elapsed"),
+            "extra": item.get("time", {}).get("extra"),
+            "player": item.get("player", {}).get("name"),
+            "assist": item.get("assist", {}).get("name"),
+            "side": "home" if team_name == match.get("home_team") else "away"
+        })
+    return events
+
+def _score_total(score):
+    try:
+        return sum(int(part.strip()) for part in (score or "").split("-"))
+    except (ValueError, TypeError):
+        return None
+
+def _feed_caught_up(events, match):
+    total = _score_total(match.get("score"))
+    return total is None or sum(1 for e in events if e["type"] == "goal") >= total
+
+def _get_cursor(league_id, season, fixture_id):
+    with _lock:
+        if fixture_id in _cursors:
+            return _cursors[fixture_id]
+    cursor = manage_firestore_state.get_document_by_path(_cursor_doc_path(league_id, season, fixture_id))
+    with _lock:
+        _cursors[fixture_id] = cursor
+    return cursor
+
+def _needs_fetch(match, cursor, triggered):
+    if match.get("status") not in TRACKED_STATUSES:
+        return False
+    if cursor is None:
+        return True
+    if cursor.get("final"):
+        return False
+    return triggered or cursor.get("score") != match.get("score") or cursor.get("status") != match.get("status")
+
+def update_match_events(league_id, season, round_data, round_events, writes=None):
+    triggered_fixtures = {e["fixture_id"] for e in round_events if e["type"] in FETCH_TRIGGER_EVENT_TYPES}
+    fetches = 0
+
+    for match in round_data.get("matches", []):
+        fixture_id = match.get("fixture_id")
+        if match.get("status") not in TRACKED_STATUSES:
+            continue
+
+        cursor = _get_cursor(league_id, season, fixture_id)
+        if _needs_fetch(match, cursor, fixture_id in triggered_fixtures):
+            if fetches >= MAX_EVENT_FETCHES_PER_TICK:
+                logger.info("Event fetch budget reached. Fixture %s will be fetched on a later tick.", fixture_id)
+            elif tick_deadline.allows_low_priority(f"the match events fetch for fixture {fixture_id}"):
+                fetches += 1
+                api_events = fetch_fixture_events_from_api(fixture=fixture_id)
+                if api_events is not None:
+                    events = _transform_events(api_events, match)
+                    lagging_fetches = 0 if _feed_caught_up(events, match) else (cursor or {}).get("lagging_fetches", 0) + 1
+                    if 0 < lagging_fetches <= MAX_LAGGING_FETCHES:
+                        # Keep the scorers found so far, but not the score and
+                        # status they were meant to cover.
+                        logger.info("Events feed for fixture %s lags the score %s. Fetching again next tick.", fixture_id, match.get("score"))
+                        covered = cursor or {}
+                    else:
+                        covered = match
+                    cursor = {
+                        "fixture_id": fixture_id,
+                        "events": events,
+                        "score": covered.get("score"),
+                        "status": covered.get("status"),
+                        "final": covered.get("status") == "completed",
+                        "lagging_fetches": lagging_fetches if covered is not match else 0,
+                        "fetched_utc": clock.utc_now().isoformat()
+                    }
+                    with _lock:
+                        _cursors[fixture_id] = cursor
+                    if writes is not None:
+                        writes.set_document(_cursor_doc_path(league_id, season, fixture_id), cursor)
+
+        if cursor and cursor.get("events"):
+            match["events"] = cursor["events"]
+
+    with _lock:
+        # Cursors from earlier rounds are persisted; keep memory to this round.
+        round_fixture_ids = {m.get("fixture_id") for m in round_data.get("matches", [])}
+        for fixture_id in [f for f in _cursors if f not in round_fixture_ids]:
+            del _cursors[fixture_id]
+
+    if fetches:
+        logger.info("Fetched match events for %s fixture(s) this tick.", fetches)
+    return fetches
@@ -3,6 +3,7 @@ import logging
 import json
 from datetime import datetime, timezone
 
+from . import clock
 from .api_providers.api_football_api.discover_current_round import discover_current_round_from_api
 from .api_providers.api_football_api.fetch_fixtures import fetch_fixtures_from_api
 from .team_mappings import MAPPINGS
@@ -54,6 +55,7 @@ def _transform_fixture_data(fixture_obj):
         "away_team_logo": teams.get("away", {}).get("logo"),
         # Match Details
         "status": clean_status,
+        "status_short": status_short,
         "score": score_str,
         "live_minute": fixture.get("status", {}).get("elapsed"),
         # Metadata
@@ -65,8 +67,29 @@ def _transform_fixture_data(fixture_obj):
         "league_logo": league.get("logo")
     }
 
+def build_round_state(round_id, fixtures):
+    clean_matches = [_transform_fixture_data(f) for f in fixtures]
+    clean_matches.sort(key=lambda x: (x.get('date', ''), x.get('kick_off_time_utc', '')))
+    
+    # Extract top-level metadata from the first match (safe assumption for a single round)
+    competition_name = "Super League"
+    league_logo = None
+    
+    if clean_matches:
+        competition_name = clean_matches[0].get('competition_name', competition_name)
+        league_logo = clean_matches[0].get('league_logo')
+
+    final_data_structure = {
+        "round_id": round_id,
+        "competition_name": competition_name,
+        "league_logo": league_logo,
+        "matches": clean_matches,
+        "last_updated_utc": clock.utc_now().isoformat()
+    }
+    return final_data_structure
+
 def prepare_current_round_state(league_id, season):
-    logger.info(f"Preparing current round state for league {league_id}, season {season}.")
+    logger.info("Preparing current round state for league %s, season %s.", league_id, season)
 
     current_round = discover_current_round_from_api(league=league_id, season=season)
     if not current_round:
@@ -84,26 +107,8 @@ def prepare_current_round_state(league_id, season):
         logger.error("API fetch for fixtures failed. Halting state preparation.")
         return None
 
-    clean_matches = [_transform_fixture_data(f) for f in fixtures]
-    clean_matches.sort(key=lambda x: (x.get('date', ''), x.get('kick_off_time_utc', '')))
-    
-    # Extract top-level metadata from the first match (safe assumption for a single round)
-    competition_name = "Super League"
-    league_logo = None
-    
-    if clean_matches:
-        competition_name = clean_matches[0].get('competition_name', competition_name)
-        league_logo = clean_matches[0].get('league_logo')
-
-    final_data_structure = {
-        "round_id": current_round,
-        "competition_name": competition_name,
-        "league_logo": league_logo,
-        "matches": clean_matches,
-        "last_updated_utc": datetime.now(timezone.utc).isoformat()
-    }
-    
-    logger.info(f"Successfully prepared state for {len(clean_matches)} matches in round '{current_round}'.")
+    final_data_structure = build_round_state(current_round, fixtures)
+    logger.info("Successfully prepared state for %s matches in round '%s'.", len(final_data_structure['matches']), current_round)
     return final_data_structure
 
 if __name__ == "__main__":
@@ -124,19 +129,25 @@ if __name__ == "__main__":
         )
         
         if prepared_data:
+            from . import snapshot_store
+            sha = snapshot_store.put(snapshot_store.ROUND, prepared_data, key=prepared_data.get("round_id"))
+            if sha:
+                logger.info("Stored prepared state as snapshot %s in %s", sha[:12], snapshot_store.SNAPSHOT_DIR)
+
+            # The other modules' CLI tests load the newest of these exports.
             output_dir = "exports"
             os.makedirs(output_dir, exist_ok=True)
-            
+
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             current_round = prepared_data.get("round_id", "unknown_round")
             safe_round = "".join(c for c in current_round if c.isalnum())
             filename = f"{output_dir}/prepared_round_state_{safe_round}_{timestamp}.json"
-            
+
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
                     json.dump(prepared_data, f, indent=4, ensure_ascii=False)
-                logger.info(f"Successfully saved prepared state data to {filename}")
+                logger.info("Successfully saved prepared state data to %s", filename)
             except IOError as e:
-                logger.error(f"Failed to write to file {filename}: {e}")
+                logger.error("Failed to write to file %s: %s", filename, e)
         else:
             logger.error("Failed to prepare current round state.")
\ No newline at end of file
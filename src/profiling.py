@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from . import clock
+from .rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated request kinds to profile on every call: "run" (orchestration
+# ticks) and/or "read" (current round reads). Individual requests can also opt
+# in with an authenticated X-Profile header.
+PROFILE_REQUESTS = {k.strip() for k in os.getenv("PROFILE_REQUESTS", "").split(",") if k.strip()}
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILES_PER_HOUR = float(os.getenv("PROFILES_PER_HOUR", "6"))
+PROFILE_DIR = os.path.join("exports", "profiles")
+
+# Profiles are admitted through a token bucket, and only one runs at a time,
+# so leaving profiling switched on in production has a bounded cost.
+_budget = TokenBucket(PROFILES_PER_HOUR / 3600.0, capacity=max(1, PROFILES_PER_HOUR))
+_active = threading.Lock()
+
+class _StackSampler:
+    # Periodically samples one thread's Python stack from a background thread
+    # and counts identical stacks, which is all a flamegraph needs.
+    def __init__(self, thread_id, interval_seconds):
+        self._thread_id = thread_id
+        self._interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.stacks = {}
+        self.samples = 0
+
+    def _run(self):
+        while not self._stop.wait(self._interval_seconds):
+            frame = sys._current_frames().get(self._thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+                frame = frame.f_back
+            if frames:
+                stack = ";".join(reversed(frames))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+def _write_profile(kind, sampler, elapsed_seconds):
+    filename = os.path.join(PROFILE_DIR, f"{kind}_{clock.utc_now().strftime('%Y%m%d_%H%M%S_%f')}.folded")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(sampler.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        logger.info("Wrote %s profile (%s samples over %.3fs) to %s", kind, sampler.samples, elapsed_seconds, filename)
+    except IOError as e:
+        logger.error("Failed to write profile to %s: %s", filename, e)
+
+def _admit(kind, requested):
+    if not requested and kind not in PROFILE_REQUESTS:
+        return False
+    if not _active.acquire(blocking=False):
+        return False
+    if not _budget.try_acquire():
+        _active.release()
+        logger.info("Profile budget of %g/hour spent. Not profiling this %s request.", PROFILES_PER_HOUR, kind)
+        return False
+    return True
+
+@contextmanager
+def maybe_profile(kind, requested=False):
+    # Profiles the enclosed block on the calling thread when profiling is
+    # enabled for `kind` (or explicitly requested) and the budget allows.
+    # Output is in folded-stack format: flamegraph.pl or speedscope read it.
+    if not _admit(kind, requested):
+        yield
+        return
+
+    sampler = _StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        _active.release()
+        _write_profile(kind, sampler, time.perf_counter() - start)
@@ -0,0 +1,53 @@
+import os
+import json
+import logging
+import threading
+
+from . import clock
+from .api_providers.api_football_api import api_client
+
+logger = logging.getLogger(__name__)
+
+# Set RECORD_MATCHDAY_DIR to capture every upstream API-Football response as
+# one JSON line, grouped into one file per league, season and UTC day. The
+# files are the input for replay_matchday.
+RECORD_MATCHDAY_DIR = None
+
+_write_lock = threading.Lock()
+
+def recording_path(record_dir, league, season, day):
+    return os.path.join(record_dir, f"matchday_{league}_{season}_{day}.jsonl")
+
+def _record_response(endpoint, params, response_items):
+    observed = clock.utc_now()
+    record = {
+        "observed_utc": observed.isoformat(),
+        "endpoint": endpoint,
+        "params": params,
+        "response": response_items
+    }
+    # Per-fixture calls (fixtures/events) carry no league or season; they
+    # belong with the configured league's other responses.
+    path = recording_path(
+        RECORD_MATCHDAY_DIR,
+        params.get("league") or os.getenv("API_FOOTBALL_LEAGUE_ID", "unknown"),
+        params.get("season") or os.getenv("API_FOOTBALL_SEASON", "unknown"),
+        observed.strftime("%Y%m%d")
+    )
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    try:
+        with _write_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+    except IOError as e:
+        logger.error("Failed to record API response to %s: %s", path, e)
+
+def install_from_env():
+    global RECORD_MATCHDAY_DIR
+    RECORD_MATCHDAY_DIR = os.getenv("RECORD_MATCHDAY_DIR")
+    if not RECORD_MATCHDAY_DIR:
+        return False
+    os.makedirs(RECORD_MATCHDAY_DIR, exist_ok=True)
+    api_client.add_response_hook(_record_response)
+    logger.info("Recording upstream API-Football responses to %s.", RECORD_MATCHDAY_DIR)
+    return True
@@ -0,0 +1,210 @@
+import os
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from pytz import timezone as pytz_timezone
+
+logger = logging.getLogger(__name__)
+
+# Resolved once at import instead of on every render.
+GR_TIMEZONE = pytz_timezone('Europe/Athens')
+
+TITLE_TEMPLATE = "{competition_name} Watch - {round_id}"
+TABLE_HEADER = "| Home | Score | Away | Status |\n|:---|:---:|:---|:---|\n"
+ROW_TEMPLATE = "| **{home}** | **{score}** | **{away}** | {status} |"
+FOOTER_TEMPLATE = "\n\n---\n*Τελευταία Ανανέωση: {updated}*"
+FOOTER_WITH_THUMBNAIL_TEMPLATE = "\n\n---\n*Τελευταία Ανανέωση: [**:**]({thumbnail_url}) {updated}*"
+
+# Only these fields influence a rendered row, so they form the cache key.
+ROW_KEY_FIELDS = (
+    "fixture_id", "home_team", "away_team", "home_team_greek", "away_team_greek",
+    "score", "status", "live_minute", "date", "kick_off_time_utc"
+)
+MAX_CACHED_ROWS = 512
+DEFAULT_POST_SECTIONS = "scorers,standings"
+
+_row_cache = {}
+_section_cache = {}
+_sections = []
+
+# render_fn(round_data) returns markdown or None. key_fn(round_data) returns a
+# hashable value that changes whenever the section's output would; the section
+# is only re-rendered when it does.
+def register_section(name, render_fn, key_fn=None):
+    _sections[:] = [s for s in _sections if s[0] != name]
+    _sections.append((name, render_fn, key_fn))
+    _section_cache.pop(name, None)
+
+def _enabled_sections():
+    configured = os.getenv("REDDIT_POST_SECTIONS", DEFAULT_POST_SECTIONS)
+    wanted = {s.strip() for s in configured.split(",") if s.strip()}
+    return [s for s in _sections if s[0] in wanted]
+
+@lru_cache(maxsize=256)
+def _kickoff_display(date_str, time_str):
+    try:
+        if len(time_str) <= 2: time_str += ":00"
+        match_utc_dt = datetime.fromisoformat(f"{date_str}T{time_str}:00+00:00")
+        match_gr_dt = match_utc_dt.astimezone(GR_TIMEZONE)
+        return f"📅 {match_gr_dt.strftime('%Y-%m-%d %H:%M')}"
+    except (ValueError, TypeError):
+        return f"📅 {date_str} {time_str} (UTC)"
+
+def _status_display(match):
+    status_val = match.get('status', 'scheduled')
+    if status_val == "in_play":
+        return f"🔴 Live ({match.get('live_minute', '')}')"
+    if status_val == "half_time":
+        return "⏸️ Half Time"
+    if status_val == "completed":
+        return "🏁 Full Time"
+    if status_val == "not_started":
+        return _kickoff_display(match.get('date', ''), match.get('kick_off_time_utc', ''))
+    return "Scheduled"
+
+def _render_row(match):
+    key = tuple(match.get(field) for field in ROW_KEY_FIELDS)
+    row = _row_cache.get(key)
+    if row is not None:
+        return row
+
+    score = (match.get('score') or "").strip() or "-"
+    row = ROW_TEMPLATE.format(
+        home=match.get('home_team_greek') or match.get('home_team', 'N/A'),
+        score=score,
+        away=match.get('away_team_greek') or match.get('away_team', 'N/A'),
+        status=_status_display(match)
+    )
+
+    if len(_row_cache) >= MAX_CACHED_ROWS:
+        _row_cache.clear()
+    _row_cache[key] = row
+    return row
+
+def _render_sections(round_data):
+    rendered = []
+    for name, render_fn, key_fn in _enabled_sections():
+        try:
+            key = key_fn(round_data) if key_fn else None
+            cached = _section_cache.get(name)
+            if key_fn and cached and cached[0] == key:
+                markdown = cached[1]
+            else:
+                markdown = render_fn(round_data)
+                if key_fn: _section_cache[name] = (key, markdown)
+        except Exception as e:
+            logger.error("Failed to render post section '%s': %s", name, e)
+            continue
+        if markdown:
+            rendered.append(markdown)
+    return rendered
+
+def _last_updated_display(round_data):
+    last_updated_utc_str = round_data.get("last_updated_utc") or datetime.now(timezone.utc).isoformat()
+    try:
+        gr_dt = datetime.fromisoformat(last_updated_utc_str).astimezone(GR_TIMEZONE)
+        return gr_dt.strftime('%Y-%m-%d %H:%M:%S') + " (GR)"
+    except (ValueError, TypeError):
+        return f"{last_updated_utc_str} (UTC)"
+
+def render_title(round_data):
+    return TITLE_TEMPLATE.format(
+        competition_name=round_data.get("competition_name", "League"),
+        round_id=round_data.get("round_id")
+    )
+
+def render_post(round_data):
+    if not round_data or "matches" not in round_data:
+        logger.error("Cannot format post body, invalid round_data provided.")
+        return None, None
+
+    title = render_title(round_data)
+    rows = [_render_row(match) for match in round_data["matches"]]
+    parts = [TABLE_HEADER + "\n".join(rows)]
+    parts.extend(_render_sections(round_data))
+
+    thumbnail_url = os.getenv("REDDIT_THUMBNAIL_URL")
+    updated = _last_updated_display(round_data)
+    if thumbnail_url:
+        footer = FOOTER_WITH_THUMBNAIL_TEMPLATE.format(thumbnail_url=thumbnail_url, updated=updated)
+    else:
+        footer = FOOTER_TEMPLATE.format(updated=updated)
+
+    return title, "\n\n".join(parts) + footer
+
+def _render_venue_section(round_data):
+    lines = []
+    for match in round_data.get("matches", []):
+        if not match.get("stadium"):
+            continue
+        home = match.get('home_team_greek') or match.get('home_team', 'N/A')
+        away = match.get('away_team_greek') or match.get('away_team', 'N/A')
+        location = match["stadium"] + (f", {match['city']}" if match.get("city") else "")
+        referee = f" | {match['referee']}" if match.get("referee") else " | -"
+        lines.append(f"| {home} - {away} | {location}{referee} |")
+    if not lines:
+        return None
+    return "**Γήπεδα**\n\n| Αγώνας | Γήπεδο | Διαιτητής |\n|:---|:---|:---|\n" + "\n".join(lines)
+
+def _venue_section_key(round_data):
+    return tuple(
+        (m.get("fixture_id"), m.get("stadium"), m.get("city"), m.get("referee"))
+        for m in round_data.get("matches", [])
+    )
+
+register_section("venue", _render_venue_section, _venue_section_key)
+
+def _render_standings_section(round_data):
+    standings = round_data.get("standings")
+    if not standings:
+        return None
+    lines = []
+    for row in standings:
+        team = row.get("team_greek") or row.get("team", "N/A")
+        if row.get("in_play"):
+            team = f"🔴 {team}"
+        lines.append(f"| {row.get('rank')} | {team} | {row.get('played')} | {row.get('goal_difference') or 0:+d} | **{row.get('points')}** |")
+    return "**Βαθμολογία (Live)**\n\n| # | Ομάδα | Αγ. | +/- | Β |\n|:---:|:---|:---:|:---:|:---:|\n" + "\n".join(lines)
+
+def _standings_section_key(round_data):
+    return tuple(
+        (r.get("team"), r.get("rank"), r.get("played"), r.get("goal_difference"), r.get("points"), r.get("in_play"))
+        for r in round_data.get("standings") or []
+    )
+
+register_section("standings", _render_standings_section, _standings_section_key)
+
+SCORER_ICONS = {"goal": "⚽", "red_card": "🟥"}
+
+def _event_minute(event):
+    minute = event.get("minute")
+    if minute is None:
+        return ""
+    return f" {minute}+{event['extra']}'" if event.get("extra") else f" {minute}'"
+
+def _render_scorers_section(round_data):
+    lines = []
+    for match in round_data.get("matches", []):
+        highlights = [e for e in match.get("events") or [] if e.get("type") in SCORER_ICONS]
+        if not highlights:
+            continue
+        home = match.get('home_team_greek') or match.get('home_team', 'N/A')
+        away = match.get('away_team_greek') or match.get('away_team', 'N/A')
+        sides = {"home": [], "away": []}
+        for event in highlights:
+            suffix = " (αυτ.)" if event.get("detail") == "Own Goal" else (" (πεν.)" if event.get("detail") == "Penalty" else "")
+            sides[event.get("side", "home")].append(f"{SCORER_ICONS[event['type']]} {event.get('player') or '?'}{suffix}{_event_minute(event)}")
+        lines.append(f"| {home} | {', '.join(sides['home']) or '-'} | {away} | {', '.join(sides['away']) or '-'} |")
+    if not lines:
+        return None
+    return "**Σκόρερ & Κόκκινες**\n\n| Γηπεδούχος | | Φιλοξενούμενος | |\n|:---|:---|:---|:---|\n" + "\n".join(lines)
+
+def _scorers_section_key(round_data):
+    return tuple(
+        (m.get("fixture_id"), m.get("home_team_greek"), m.get("away_team_greek"),
+         tuple((e.get("type"), e.get("player"), e.get("minute"), e.get("extra"), e.get("side"), e.get("detail"))
+               for e in m.get("events") or [] if e.get("type") in SCORER_ICONS))
+        for m in round_data.get("matches", [])
+    )
+
+register_section("scorers", _render_scorers_section, _scorers_section_key)
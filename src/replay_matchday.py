@@ -0,0 +1,298 @@
+import os
+import copy
+import json
+import time
+import logging
+import tempfile
+from datetime import datetime, timedelta
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+from . import clock
+from . import freshness
+from .api_providers.api_football_api import api_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEED = 100.0
+DEFAULT_MAX_TICKS = 2000
+# Cloud Tasks retries a failed /run; the replay models that as a fixed delay.
+FAILED_TICK_RETRY_SECONDS = 60
+# Stop once the virtual clock runs this far past the last recorded response.
+TRAILING_WINDOW = timedelta(hours=1)
+
+def load_recording(path):
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                record["observed"] = datetime.fromisoformat(record["observed_utc"])
+                records.append(record)
+    records.sort(key=lambda r: r["observed"])
+    return records
+
+def _params_key(endpoint, params):
+    return endpoint, json.dumps({k: str(v) for k, v in (params or {}).items()}, sort_keys=True)
+
+class _RecordedUpstream:
+    # Serves, for each request, the latest recorded response observed at or
+    # before the virtual now (or the earliest one if the clock is before it).
+    def __init__(self, records):
+        self._responses = {}
+        for record in records:
+            key = _params_key(record["endpoint"], record["params"])
+            self._responses.setdefault(key, []).append((record["observed"], record["response"]))
+        self.calls = 0
+        self.misses = 0
+        self.calls_by_endpoint = {}
+
+    def __call__(self, endpoint, params):
+        self.calls += 1
+        self.calls_by_endpoint[endpoint] = self.calls_by_endpoint.get(endpoint, 0) + 1
+        candidates = self._responses.get(_params_key(endpoint, params))
+        if not candidates:
+            self.misses += 1
+            logger.warning("No recorded response for %s %s.", endpoint, params)
+            return None
+        now = clock.utc_now()
+        chosen = candidates[0][1]
+        for observed, response in candidates:
+            if observed > now:
+                break
+            chosen = response
+        return copy.deepcopy(chosen)
+
+class _LocalSnapshot:
+    def __init__(self, reference, data, update_time):
+        self.reference = reference
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+class _LocalDocument:
+    def __init__(self, store, path):
+        self._store = store
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def get(self, transaction=None):
+        self._store.reads += 1
+        data, update_time = self._store.documents.get(self.path, (None, None))
+        return _LocalSnapshot(self, data, update_time)
+
+    def set(self, data, merge=False, option=None):
+        existing = self._store.documents.get(self.path, ({}, None))[0] if merge else {}
+        return self._store.write(self.path, dict(existing, **copy.deepcopy(data)))
+
+    def update(self, data, option=None):
+        existing, update_time = self._store.documents.get(self.path, (None, None))
+        if existing is None:
+            raise NotFound(f"No document to update: {self.path}")
+        if option is not None and option.get("last_update_time") not in (None, update_time):
+            raise FailedPrecondition(f"{self.path} was updated since {option['last_update_time']}")
+        return self._store.write(self.path, dict(existing, **copy.deepcopy(data)))
+
+    def delete(self, option=None):
+        self._store.documents.pop(self.path, None)
+        self._store.writes += 1
+
+    def collection(self, name):
+        return _LocalCollection(self._store, f"{self.path}/{name}")
+
+class _LocalCollection:
+    def __init__(self, store, path):
+        self._store = store
+        self.path = path
+
+    def document(self, name):
+        return _LocalDocument(self._store, f"{self.path}/{name}")
+
+class _LocalBatch:
+    def __init__(self):
+        self._operations = []
+
+    def set(self, reference, data, merge=False, option=None):
+        self._operations.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data, option=None):
+        self._operations.append(lambda: reference.update(data, option=option))
+
+    def delete(self, reference, option=None):
+        self._operations.append(reference.delete)
+
+    def commit(self):
+        results = [_LocalWriteResult(operation()) for operation in self._operations]
+        self._operations = []
+        return results
+
+class _LocalWriteResult:
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+class LocalFirestore:
+    # In-memory stand-in for the subset of the Firestore client the pipeline uses.
+    def __init__(self):
+        self.documents = {}
+        self.reads = 0
+        self.writes = 0
+        self.version = 0
+
+    def write(self, path, data):
+        self.writes += 1
+        # A counter rather than the virtual clock, which stands still within a
+        # tick: every write gets a distinct version for preconditions.
+        self.version += 1
+        self.documents[path] = (data, self.version)
+        return self.version
+
+    def write_option(self, **kwargs):
+        return kwargs
+
+    def collection(self, name):
+        return _LocalCollection(self, name)
+
+    def document(self, path):
+        return _LocalDocument(self, path)
+
+    def batch(self):
+        return _LocalBatch()
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def replay(records, speed=DEFAULT_SPEED, max_ticks=DEFAULT_MAX_TICKS):
+    if not records:
+        logger.error("Recording is empty. Nothing to replay.")
+        return None
+
+    # Imported here so the stand-ins are installed before anything runs.
+    from . import manager
+    from . import manage_firestore_state
+    from . import distribute_to_reddit
+    from . import schedule_next_run
+    from . import season_archive
+
+    # Per-fixture records carry no league or season, so take them from the
+    # first record that does.
+    scoped = next((r["params"] for r in records if r["params"].get("league")), None)
+    if scoped is None:
+        logger.error("No record in the recording names a league. Nothing to replay.")
+        return None
+    league, season = scoped.get("league"), scoped.get("season")
+    virtual_now = [records[0]["observed"]]
+    last_observed = records[-1]["observed"]
+
+    upstream = _RecordedUpstream(records)
+    local_db = LocalFirestore()
+    reddit = {"creates": 0, "edits": 0}
+    scheduled = []
+
+    def _create_or_get_post(round_data, league_id=None, season=None, subreddit=None):
+        reddit["creates"] += 1
+        return f"t3_replay_{subreddit or 'primary'}"
+
+    def _update_post(post_id, round_data):
+        reddit["edits"] += 1
+        freshness.record_round(freshness.PUBLISHED, round_data, target=post_id)
+        return True
+
+    def _schedule_next_run(execution_timestamp, target_url, round_id=None):
+        scheduled.append(execution_timestamp)
+        return True
+
+    clock.set_clock(lambda: virtual_now[0])
+    freshness.reset()
+    api_client.set_transport(upstream)
+    manage_firestore_state.db = local_db
+    manage_firestore_state.acquire_tick_lease = lambda lease_key, holder_id, ttl_seconds: True
+    manage_firestore_state.release_tick_lease = lambda lease_key, holder_id: True
+    distribute_to_reddit.create_or_get_post = _create_or_get_post
+    distribute_to_reddit.update_post = _update_post
+    distribute_to_reddit.PUBLISHER_THREAD_ENABLED = False
+    schedule_next_run.schedule_next_run = _schedule_next_run
+    season_archive.ARCHIVE_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="replay_archive_"), "archive.sqlite3")
+    manager.LEAGUE_ID, manager.SEASON = str(league), str(season)
+    os.environ.setdefault("CLOUD_RUN_SERVICE_URL", "http://replay.local/run")
+    os.environ.setdefault("TARGET_SUBREDDIT", "replay")
+
+    tick_latencies = []
+    ticks = failed_ticks = 0
+    wall_start = time.perf_counter()
+    try:
+        while ticks < max_ticks:
+            scheduled_before = len(scheduled)
+            tick_start = time.perf_counter()
+            ok = manager.run_orchestration_logic()
+            distribute_to_reddit.publish_due_edits()
+            tick_latencies.append(time.perf_counter() - tick_start)
+            ticks += 1
+
+            now = virtual_now[0]
+            if not ok:
+                failed_ticks += 1
+                next_run = now + timedelta(seconds=FAILED_TICK_RETRY_SECONDS)
+            elif len(scheduled) > scheduled_before and scheduled[-1] is not None:
+                next_run = scheduled[-1]
+            else:
+                logger.info("No further run scheduled at %s. Replay finished.", now.isoformat())
+                break
+
+            next_run = max(next_run, now + timedelta(seconds=1))
+            if next_run > last_observed + TRAILING_WINDOW:
+                logger.info("Next run %s is past the end of the recording. Replay finished.", next_run.isoformat())
+                break
+            if speed > 0:
+                time.sleep((next_run - now).total_seconds() / speed)
+            virtual_now[0] = next_run
+    finally:
+        clock.reset_clock()
+        api_client.set_transport(None)
+
+    return {
+        "league": league,
+        "season": season,
+        "ticks": ticks,
+        "failed_ticks": failed_ticks,
+        "virtual_start_utc": records[0]["observed"].isoformat(),
+        "virtual_end_utc": virtual_now[0].isoformat(),
+        "upstream_calls": upstream.calls,
+        "upstream_calls_by_endpoint": upstream.calls_by_endpoint,
+        "upstream_misses": upstream.misses,
+        "firestore_reads": local_db.reads,
+        "firestore_writes": local_db.writes,
+        "reddit_creates": reddit["creates"],
+        "reddit_edits": reddit["edits"],
+        "wall_seconds": round(time.perf_counter() - wall_start, 3),
+        "freshness": freshness.report()["stages"],
+        "tick_latency_ms": {
+            "p50": round(_percentile(tick_latencies, 0.5) * 1000, 2),
+            "p95": round(_percentile(tick_latencies, 0.95) * 1000, 2),
+            "max": round(max(tick_latencies) * 1000, 2)
+        }
+    }
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Replay a recorded matchday through the orchestration logic.")
+    parser.add_argument("recording", help="Path to a matchday_*.jsonl file written by record_matchday.")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED, help="Virtual-to-real time ratio (0 = no sleeping).")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS)
+    args = parser.parse_args()
+
+    report = replay(load_recording(args.recording), speed=args.speed, max_ticks=args.max_ticks)
+    if report:
+        print(json.dumps(report, indent=2))
@@ -53,15 +53,15 @@ def schedule_next_run(execution_timestamp, target_url, round_id=None):
     # --- END UPDATED LOGIC ---
 
     try:
-        logger.info(f"Attempting to schedule task '{task_name_for_logs}' to run at {execution_timestamp.isoformat()}")
+        logger.info("Attempting to schedule task '%s' to run at %s", task_name_for_logs, execution_timestamp.isoformat())
         response = client.create_task(parent=queue_path, task=task)
-        logger.info(f"Successfully created task: {response.name}")
+        logger.info("Successfully created task: %s", response.name)
         return True
     except google_exceptions.AlreadyExists:
-        logger.info(f"Task '{task_name_for_logs}' already exists in the queue. Skipping duplicate scheduling.")
+        logger.info("Task '%s' already exists in the queue. Skipping duplicate scheduling.", task_name_for_logs)
         return True
     except Exception as e:
-        logger.error(f"A critical error occurred creating the task: {e}")
+        logger.error("A critical error occurred creating the task: %s", e)
         return False
 
 if __name__ == "__main__":
@@ -80,6 +80,6 @@ if __name__ == "__main__":
         success = schedule_next_run(future_time, TEST_URL, round_id="cli-test-round")
         
         if success:
-            logger.info(f"CLI Test successful.")
+            logger.info("CLI Test successful.")
         else:
             logger.error("CLI Test failed.")
\ No newline at end of file
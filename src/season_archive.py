@@ -0,0 +1,226 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+from . import clock
+from . import manage_firestore_state
+from .team_mappings import MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DB_PATH = os.getenv("ARCHIVE_DB_PATH", os.path.join("exports", "season_archive.sqlite3"))
+# Only the orchestrator archives rounds as they complete. Instances serving
+# the history endpoints fill their archive from Firestore's round documents,
+# and re-sync at most this often to pick up rounds finished elsewhere.
+ARCHIVE_SYNC_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_SYNC_INTERVAL_SECONDS", "600"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    league_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    round_id TEXT NOT NULL,
+    competition_name TEXT,
+    archived_utc TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (league_id, season, round_id)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    fixture_id INTEGER PRIMARY KEY,
+    league_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    round_id TEXT NOT NULL,
+    date TEXT,
+    kick_off_time_utc TEXT,
+    home_team TEXT COLLATE NOCASE,
+    away_team TEXT COLLATE NOCASE,
+    score TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_matches_round ON matches (league_id, season, round_id);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home_team, date);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away_team, date);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date);
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+_sync_lock = threading.Lock()
+_sync_locks = {}
+_synced_at = {}
+
+def _connect():
+    global _schema_ready
+    directory = os.path.dirname(ARCHIVE_DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(ARCHIVE_DB_PATH, timeout=10)
+    connection.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                _schema_ready = True
+    return connection
+
+def _is_round_complete(round_data):
+    matches = round_data.get("matches") or []
+    return bool(matches) and all(m.get("status") == "completed" for m in matches)
+
+def archive_round(league_id, season, round_data):
+    if not round_data or not _is_round_complete(round_data):
+        logger.warning("Refusing to archive round '%s': not every match is completed.", (round_data or {}).get('round_id'))
+        return False
+
+    round_id = round_data.get("round_id")
+    payload = json.dumps(round_data, ensure_ascii=False, separators=(",", ":"))
+    match_rows = [
+        (m.get("fixture_id"), str(league_id), str(season), round_id, m.get("date"), m.get("kick_off_time_utc"),
+         m.get("home_team"), m.get("away_team"), m.get("score"), m.get("status"))
+        for m in round_data["matches"]
+    ]
+
+    try:
+        with closing(_connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO rounds (league_id, season, round_id, competition_name, archived_utc, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(league_id), str(season), round_id, round_data.get("competition_name"),
+                 datetime.now(timezone.utc).isoformat(), payload)
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO matches (fixture_id, league_id, season, round_id, date, kick_off_time_utc, home_team, away_team, score, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                match_rows
+            )
+        logger.info("Archived round '%s' with %s matches to %s.", round_id, len(match_rows), ARCHIVE_DB_PATH)
+        return True
+    except sqlite3.Error as e:
+        logger.error("Failed to archive round '%s': %s", round_id, e)
+        return False
+
+def _read_archived_round(league_id, season, round_id):
+    with closing(_connect()) as connection, connection:
+        row = connection.execute(
+            "SELECT payload FROM rounds WHERE league_id = ? AND season = ? AND round_id = ?",
+            (str(league_id), str(season), round_id)
+        ).fetchone()
+    return json.loads(row["payload"]) if row else None
+
+def get_archived_round(league_id, season, round_id):
+    # The local archive is per instance. A miss triggers at most one season
+    # sync per ARCHIVE_SYNC_INTERVAL_SECONDS, never a per-round document read,
+    # so repeated misses are answered locally.
+    try:
+        round_data = _read_archived_round(league_id, season, round_id)
+        if round_data is None and ensure_season_synced(league_id, season):
+            round_data = _read_archived_round(league_id, season, round_id)
+        return round_data
+    except sqlite3.Error as e:
+        logger.error("Failed to read archived round '%s': %s", round_id, e)
+        return None
+
+def _archived_round_ids(league_id, season):
+    with closing(_connect()) as connection, connection:
+        rows = connection.execute(
+            "SELECT round_id FROM rounds WHERE league_id = ? AND season = ?", (str(league_id), str(season))
+        ).fetchall()
+    return {row["round_id"] for row in rows}
+
+def _newest_archived_update(league_id, season):
+    with closing(_connect()) as connection, connection:
+        row = connection.execute(
+            "SELECT MAX(json_extract(payload, '$.last_updated_utc')) AS newest FROM rounds WHERE league_id = ? AND season = ?",
+            (str(league_id), str(season))
+        ).fetchone()
+    return row["newest"]
+
+def sync_season(league_id, season):
+    # Archives the completed rounds of the season that Firestore updated after
+    # the newest round this instance holds; the first sync reads them all.
+    # Returns False if Firestore could not be read.
+    try:
+        newest = _newest_archived_update(league_id, season)
+        archived = _archived_round_ids(league_id, season)
+    except sqlite3.Error as e:
+        logger.error("Failed to list archived rounds for season %s: %s", season, e)
+        return False
+    collection_path = f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/rounds"
+    round_documents = manage_firestore_state.get_collection_documents(collection_path, updated_after=newest)
+    if round_documents is None:
+        return False
+    added = 0
+    for round_data in round_documents.values():
+        if round_data.get("round_id") not in archived and _is_round_complete(round_data):
+            added += archive_round(league_id, season, round_data)
+    logger.info("Synced season %s archive from Firestore: %s new round(s).", season, added)
+    return True
+
+def ensure_season_synced(league_id, season):
+    # Returns False only if the season has never been synced on this instance
+    # and cannot be now; after that, a failed re-sync serves what is held.
+    # Callers pass only the configured league and served seasons, which keeps
+    # _synced_at and _sync_locks small.
+    key = (str(league_id), str(season))
+    synced_at = _synced_at.get(key)
+    if synced_at is not None and clock.monotonic() - synced_at < ARCHIVE_SYNC_INTERVAL_SECONDS:
+        return True
+    with _sync_lock:
+        season_lock = _sync_locks.setdefault(key, threading.Lock())
+    # Once the season has been synced, requests serve what is held rather than
+    # queueing behind a re-sync already running.
+    if not season_lock.acquire(blocking=synced_at is None):
+        return True
+    try:
+        synced_at = _synced_at.get(key)
+        if synced_at is not None and clock.monotonic() - synced_at < ARCHIVE_SYNC_INTERVAL_SECONDS:
+            return True
+        if sync_season(league_id, season):
+            _synced_at[key] = clock.monotonic()
+            return True
+        return synced_at is not None
+    finally:
+        season_lock.release()
+
+def _canonical_team_name(team_name):
+    for english_name, greek_name in MAPPINGS["team_to_greek"].items():
+        if team_name.lower() in (english_name.lower(), greek_name.lower()):
+            return english_name
+    return team_name
+
+def get_team_results(team_name, league_id=None, season=None, limit=50):
+    team = _canonical_team_name(team_name)
+    query = "SELECT * FROM matches WHERE (home_team = ? OR away_team = ?)"
+    params = [team, team]
+    if league_id is not None:
+        query += " AND league_id = ?"
+        params.append(str(league_id))
+    if season is not None:
+        query += " AND season = ?"
+        params.append(str(season))
+    query += " ORDER BY date DESC, kick_off_time_utc DESC LIMIT ?"
+    params.append(int(limit))
+
+    try:
+        with closing(_connect()) as connection, connection:
+            rows = connection.execute(query, params).fetchall()
+    except sqlite3.Error as e:
+        logger.error("Failed to query archived results for team '%s': %s", team_name, e)
+        return None
+    return [dict(row) for row in rows]
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    TEAM_TO_TEST = "PAOK"
+    results = get_team_results(TEAM_TO_TEST, league_id=os.getenv("API_FOOTBALL_LEAGUE_ID"), season=os.getenv("API_FOOTBALL_SEASON"))
+    if results is None:
+        logger.error("Archive query failed.")
+    else:
+        print(f"\n{len(results)} archived result(s) for {TEAM_TO_TEST}:")
+        for r in results:
+            print(f"  {r['date']} {r['round_id']}: {r['home_team']} {r['score']} {r['away_team']}")
@@ -0,0 +1,147 @@
+import os
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from . import clock
+from . import manage_firestore_state
+from .api_providers.api_football_api.fetch_fixtures import fetch_fixtures_from_api
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_REFRESH_HOURS = int(os.getenv("CALENDAR_REFRESH_HOURS", "48"))
+# After a failed refresh, wait at least this long before trying again.
+CALENDAR_RETRY_MINUTES = 60
+# Fixtures in these states will never kick off (again).
+INACTIVE_STATUSES = {"FT", "AET", "PEN", "CANC", "ABD", "AWD", "WO", "PST"}
+
+_lock = threading.Lock()
+_calendars = {}
+
+def _calendar_doc_path(league_id, season):
+    return f"{manage_firestore_state.LEAGUE_COLLECTION}/{league_id}/seasons/{season}/calendar/index"
+
+def _build_entries(fixtures):
+    entries = []
+    for fixture_obj in fixtures:
+        fixture = fixture_obj.get("fixture", {})
+        try:
+            kickoff = datetime.fromisoformat(fixture.get("date"))
+        except (TypeError, ValueError):
+            continue
+        entries.append({
+            "kickoff_utc": kickoff.astimezone(timezone.utc).isoformat(),
+            "round_id": fixture_obj.get("league", {}).get("round"),
+            "fixture_id": fixture.get("id"),
+            "status_short": fixture.get("status", {}).get("short")
+        })
+    entries.sort(key=lambda e: e["kickoff_utc"])
+    return entries
+
+def _index(calendar):
+    # Sorted kickoff datetimes of fixtures that can still be played.
+    active = [e for e in calendar["entries"] if e.get("status_short") not in INACTIVE_STATUSES]
+    return [datetime.fromisoformat(e["kickoff_utc"]) for e in active], active
+
+def _is_stale(calendar, now):
+    return now - datetime.fromisoformat(calendar["refreshed_utc"]) >= timedelta(hours=CALENDAR_REFRESH_HOURS)
+
+def refresh_calendar(league_id, season):
+    fixtures = fetch_fixtures_from_api(league=league_id, season=season, timezone="UTC")
+    if fixtures is None:
+        logger.error("Could not fetch the season's fixtures to build the calendar.")
+        return None
+
+    calendar = {
+        "league_id": str(league_id),
+        "season": str(season),
+        "entries": _build_entries(fixtures),
+        "refreshed_utc": clock.utc_now().isoformat()
+    }
+    kickoffs, active = _index(calendar)
+    with _lock:
+        _calendars[(str(league_id), str(season))] = (calendar, kickoffs, active)
+    manage_firestore_state.set_round_data(_calendar_doc_path(league_id, season), calendar)
+    logger.info("Season calendar refreshed: %s fixtures, %s still to be played.", len(calendar['entries']), len(active))
+    return calendar
+
+def _get_calendar(league_id, season):
+    key = (str(league_id), str(season))
+    now = clock.utc_now()
+    with _lock:
+        cached = _calendars.get(key)
+    if cached is None:
+        # Cold instance: start from the persisted calendar.
+        stored = manage_firestore_state.get_document_by_path(_calendar_doc_path(league_id, season))
+        if stored and stored.get("entries") is not None:
+            cached = (stored, *_index(stored))
+            with _lock:
+                _calendars[key] = cached
+    if cached and not _is_stale(cached[0], now):
+        return cached
+
+    if refresh_calendar(league_id, season) is None:
+        # A stale calendar is still better than none.
+        return cached
+    with _lock:
+        return _calendars.get(key)
+
+def season_start(league_id, season):
+    # Kickoff of the season's first fixture, or None if the calendar is unavailable.
+    cached = _get_calendar(league_id, season)
+    if not cached or not cached[0]["entries"]:
+        return None
+    return datetime.fromisoformat(cached[0]["entries"][0]["kickoff_utc"])
+
+def next_kickoff(league_id, season, after=None):
+    cached = _get_calendar(league_id, season)
+    if not cached:
+        return None
+    _, kickoffs, active = cached
+    after = after or clock.utc_now()
+    position = bisect.bisect_right(kickoffs, after)
+    if position >= len(active):
+        return None
+    return active[position]
+
+def next_wake_time(league_id, season, lead_hours, now=None):
+    # Returns (wake_time, entry) for the window opening lead_hours before the
+    # next kickoff, or None if the calendar is unavailable. Sleep is capped at the refresh cadence so
+    # reschedules (and next season's fixtures) are always picked up.
+    now = now or clock.utc_now()
+    cached = _get_calendar(league_id, season)
+    if not cached:
+        return None
+
+    calendar = cached[0]
+    refresh_due = max(
+        datetime.fromisoformat(calendar["refreshed_utc"]) + timedelta(hours=CALENDAR_REFRESH_HOURS),
+        now + timedelta(minutes=CALENDAR_RETRY_MINUTES)
+    )
+    entry = next_kickoff(league_id, season, after=now)
+    if entry is None:
+        logger.info("No upcoming fixtures in the calendar. Waking at the next refresh (%s).", refresh_due.isoformat())
+        return refresh_due, None
+
+    wake_time = datetime.fromisoformat(entry["kickoff_utc"]) - timedelta(hours=lead_hours)
+    wake_time = max(min(wake_time, refresh_due), now + timedelta(minutes=1))
+    logger.info("Next kickoff is %s (%s). Waking at %s.", entry['kickoff_utc'], entry['round_id'], wake_time.isoformat())
+    return wake_time, entry
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    LEAGUE_ID_TO_TEST = os.getenv("API_FOOTBALL_LEAGUE_ID")
+    SEASON_TO_TEST = os.getenv("API_FOOTBALL_SEASON")
+
+    if not LEAGUE_ID_TO_TEST or not SEASON_TO_TEST:
+        logger.critical("API_FOOTBALL_LEAGUE_ID and/or API_FOOTBALL_SEASON not set in .env file. Aborting test.")
+    else:
+        wake = next_wake_time(LEAGUE_ID_TO_TEST, SEASON_TO_TEST, lead_hours=1)
+        if wake:
+            print(f"\nNext wake-up: {wake[0].isoformat()} for {wake[1]}\n")
+        else:
+            print("\nCalendar unavailable.\n")
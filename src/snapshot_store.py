@@ -0,0 +1,260 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from . import clock
+from .api_providers.api_football_api import api_client
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available.
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Prepared rounds and raw upstream responses are stored once per distinct
+# content under objects/<sha256 prefix>/<sha256>.json.(zst|gz). A daily JSONL
+# manifest records when each stream's content changed, so scanning a time
+# range only opens that range's manifest files.
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join("exports", "snapshots"))
+SNAPSHOT_RETENTION_DAYS = int(os.getenv("SNAPSHOT_RETENTION_DAYS", "30"))
+# Top-level fields that change on every tick without the content changing.
+VOLATILE_FIELDS = ("last_updated_utc",)
+
+ROUND = "round"
+API = "api"
+
+_lock = threading.Lock()
+_last_sha_by_stream = {}
+_last_pruned_at = None
+
+def _canonical_bytes(payload):
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k not in VOLATILE_FIELDS}
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _object_path(snapshot_dir, sha, extension):
+    return os.path.join(snapshot_dir, "objects", sha[:2], f"{sha}.json.{extension}")
+
+def _compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), "zst"
+    return gzip.compress(data, compresslevel=6), "gz"
+
+def _manifest_path(snapshot_dir, day):
+    return os.path.join(snapshot_dir, "manifest", f"{day}.jsonl")
+
+def _stream_key(kind, key, params):
+    return kind, key, json.dumps(params or {}, sort_keys=True, default=str)
+
+def put(kind, payload, key=None, params=None, snapshot_dir=None):
+    # Stores payload if its content is new and appends a manifest entry if it
+    # differs from the stream's previous snapshot. Returns the content hash.
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    data = _canonical_bytes(payload)
+    sha = hashlib.sha256(data).hexdigest()
+    stream = _stream_key(kind, key, params)
+    observed = clock.utc_now()
+
+    with _lock:
+        if _last_sha_by_stream.get((snapshot_dir, stream)) == sha:
+            return sha
+        try:
+            if not any(os.path.exists(_object_path(snapshot_dir, sha, ext)) for ext in ("zst", "gz")):
+                compressed, extension = _compress(data)
+                path = _object_path(snapshot_dir, sha, extension)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(f"{path}.tmp", 'wb') as f:
+                    f.write(compressed)
+                os.replace(f"{path}.tmp", path)
+
+            entry = {"observed_utc": observed.isoformat(), "kind": kind, "key": key, "params": params, "sha": sha}
+            manifest_path = _manifest_path(snapshot_dir, observed.strftime("%Y%m%d"))
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            with open(manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except IOError as e:
+            logger.error("Failed to store %s snapshot %s: %s", kind, sha[:12], e)
+            return None
+        _last_sha_by_stream[(snapshot_dir, stream)] = sha
+
+    _maybe_prune(snapshot_dir, observed)
+    return sha
+
+def _resolve_sha(snapshot_dir, sha_prefix):
+    # Accepts the abbreviated hashes that `list` prints.
+    prefix_dir = os.path.join(snapshot_dir, "objects", sha_prefix[:2])
+    if len(sha_prefix) >= 64 or not os.path.isdir(prefix_dir):
+        return sha_prefix
+    matches = {name.split(".", 1)[0] for name in os.listdir(prefix_dir) if name.startswith(sha_prefix)}
+    return matches.pop() if len(matches) == 1 else sha_prefix
+
+def get(sha, snapshot_dir=None):
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    sha = _resolve_sha(snapshot_dir, sha)
+    zst_path = _object_path(snapshot_dir, sha, "zst")
+    if os.path.exists(zst_path):
+        if zstandard is None:
+            raise RuntimeError(f"Snapshot {sha} is zstd-compressed but zstandard is not installed.")
+        with open(zst_path, 'rb') as f:
+            return json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+    gz_path = _object_path(snapshot_dir, sha, "gz")
+    if os.path.exists(gz_path):
+        with gzip.open(gz_path, 'rb') as f:
+            return json.loads(f.read())
+    return None
+
+def _manifest_days(snapshot_dir):
+    manifest_dir = os.path.join(snapshot_dir, "manifest")
+    if not os.path.isdir(manifest_dir):
+        return []
+    return sorted(f[:-len(".jsonl")] for f in os.listdir(manifest_dir) if f.endswith(".jsonl"))
+
+def _as_utc(value):
+    # Naive datetimes (e.g. typed on the command line) are taken as UTC, the
+    # zone every manifest stamp is written in.
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+def _utc_datetime(text):
+    return _as_utc(datetime.fromisoformat(text))
+
+def iter_manifest(since=None, until=None, kind=None, snapshot_dir=None):
+    # Yields manifest entries in time order, optionally restricted to a time
+    # range (inclusive datetimes) and a kind.
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    since, until = _as_utc(since), _as_utc(until)
+    for day in _manifest_days(snapshot_dir):
+        if since and day < since.strftime("%Y%m%d"):
+            continue
+        if until and day > until.strftime("%Y%m%d"):
+            break
+        with open(_manifest_path(snapshot_dir, day), 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                observed = datetime.fromisoformat(entry["observed_utc"])
+                if (since and observed < since) or (until and observed > until):
+                    continue
+                if kind and entry["kind"] != kind:
+                    continue
+                yield entry
+
+def prune(now=None, retention_days=None, snapshot_dir=None):
+    # Drops manifest days past retention, then deletes every object that no
+    # remaining manifest entry references. Returns the number of objects removed.
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    now = now or clock.utc_now()
+    retention_days = SNAPSHOT_RETENTION_DAYS if retention_days is None else retention_days
+    oldest_day = (now - timedelta(days=retention_days)).strftime("%Y%m%d")
+
+    with _lock:
+        referenced = set()
+        for day in _manifest_days(snapshot_dir):
+            if day < oldest_day:
+                os.remove(_manifest_path(snapshot_dir, day))
+                continue
+            with open(_manifest_path(snapshot_dir, day), 'r', encoding='utf-8') as f:
+                referenced.update(json.loads(line)["sha"] for line in f if line.strip())
+
+        removed = 0
+        objects_dir = os.path.join(snapshot_dir, "objects")
+        for prefix in (os.listdir(objects_dir) if os.path.isdir(objects_dir) else []):
+            for name in os.listdir(os.path.join(objects_dir, prefix)):
+                if name.split(".", 1)[0] not in referenced:
+                    os.remove(os.path.join(objects_dir, prefix, name))
+                    removed += 1
+        # Streams whose last entry was pruned must announce their content again.
+        for stream in [k for k, sha in _last_sha_by_stream.items() if sha not in referenced]:
+            del _last_sha_by_stream[stream]
+
+    if removed:
+        logger.info("Pruned %s snapshot object(s) older than %s days.", removed, retention_days)
+    return removed
+
+def _maybe_prune(snapshot_dir, now):
+    global _last_pruned_at
+    if _last_pruned_at is not None and now - _last_pruned_at < timedelta(days=1):
+        return
+    _last_pruned_at = now
+    try:
+        prune(now=now, snapshot_dir=snapshot_dir)
+    except OSError as e:
+        logger.error("Snapshot retention pass failed: %s", e)
+
+def export_recording(output_path, since=None, until=None, snapshot_dir=None):
+    # Writes the API snapshots in a range in the record_matchday JSONL format,
+    # ready for replay_matchday. Per-fixture responses (fixtures/events) carry
+    # no league, so the recording starts at the first league-scoped response
+    # and a replay can always tell which league and season it covers.
+    count = 0
+    scoped = False
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for entry in iter_manifest(since=since, until=until, kind=API, snapshot_dir=snapshot_dir):
+            scoped = scoped or bool((entry["params"] or {}).get("league"))
+            if not scoped:
+                continue
+            record = {
+                "observed_utc": entry["observed_utc"],
+                "endpoint": entry["key"],
+                "params": entry["params"],
+                "response": get(entry["sha"], snapshot_dir=snapshot_dir)
+            }
+            out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+def is_enabled():
+    return os.getenv("SNAPSHOT_STORE_ENABLED", "false").lower() == "true"
+
+def _record_api_response(endpoint, params, response_items):
+    put(API, response_items, key=endpoint, params=params)
+
+def install_from_env():
+    # SNAPSHOT_STORE_ENABLED=true keeps every distinct upstream response; the
+    # manager stores prepared rounds under the same switch.
+    if not is_enabled():
+        return False
+    api_client.add_response_hook(_record_api_response)
+    logger.info("Storing upstream API-Football snapshots in %s.", SNAPSHOT_DIR)
+    return True
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the snapshot store.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="List manifest entries.")
+    list_parser.add_argument("--since", type=_utc_datetime)
+    list_parser.add_argument("--until", type=_utc_datetime)
+    list_parser.add_argument("--kind", choices=[ROUND, API])
+    show_parser = subparsers.add_parser("show", help="Print one snapshot by hash.")
+    show_parser.add_argument("sha")
+    export_parser = subparsers.add_parser("export", help="Export API snapshots as a replayable recording.")
+    export_parser.add_argument("output")
+    export_parser.add_argument("--since", type=_utc_datetime)
+    export_parser.add_argument("--until", type=_utc_datetime)
+    prune_parser = subparsers.add_parser("prune", help="Apply the retention policy now.")
+    prune_parser.add_argument("--retention-days", type=int, default=SNAPSHOT_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for entry in iter_manifest(since=args.since, until=args.until, kind=args.kind, snapshot_dir=args.dir):
+            print(f"{entry['observed_utc']}  {entry['kind']:<5}  {entry['sha'][:12]}  {entry['key']}  {entry['params'] or ''}")
+    elif args.command == "show":
+        print(json.dumps(get(args.sha, snapshot_dir=args.dir), indent=2, ensure_ascii=False))
+    elif args.command == "export":
+        count = export_recording(args.output, since=args.since, until=args.until, snapshot_dir=args.dir)
+        print(f"Exported {count} record(s) to {args.output}")
+    elif args.command == "prune":
+        print(f"Removed {prune(retention_days=args.retention_days, snapshot_dir=args.dir)} object(s).")
@@ -0,0 +1,122 @@
+import io
+import os
+import re
+import logging
+import threading
+import requests
+
+from . import clock
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only the original PNG is served.
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+LOGO_CACHE_DIR = os.getenv("LOGO_CACHE_DIR", os.path.join("exports", "logos"))
+# Team crests are fetched from the API-Football media CDN only, by numeric id,
+# so the proxy can never be pointed at an arbitrary URL.
+LOGO_SOURCE_URL = "https://media.api-sports.io/football/teams/{team_id}.png"
+# Crest URLs in API responses end in the team's id, e.g. .../teams/553.png.
+LOGO_URL_PATTERN = re.compile(r"/football/teams/(\d+)\.png$")
+LOGO_SIZES = (32, 64)
+DEFAULT_LOGO_SIZE = 64
+# A logo that failed to download is not retried for this long.
+LOGO_FAILURE_RETRY_SECONDS = 600
+
+_locks_lock = threading.Lock()
+_locks = {}
+_failed_at = {}
+
+def _team_lock(team_id):
+    with _locks_lock:
+        return _locks.setdefault(team_id, threading.Lock())
+
+def _original_path(team_id):
+    return os.path.join(LOGO_CACHE_DIR, f"{team_id}.png")
+
+def _variant_path(team_id, size, image_format):
+    return os.path.join(LOGO_CACHE_DIR, f"{team_id}_{size}.{image_format}")
+
+def _write_atomically(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _team_id_from_url(logo_url):
+    match = LOGO_URL_PATTERN.search(logo_url or "")
+    return match.group(1) if match else None
+
+def known_team_ids(round_data=None, standings=None):
+    # The ids of every team whose crest the current round or standings link to.
+    urls = []
+    for match in (round_data or {}).get("matches", []):
+        urls += [match.get("home_team_logo"), match.get("away_team_logo")]
+    for row in standings or []:
+        urls.append(row.get("team_logo"))
+    return {team_id for team_id in map(_team_id_from_url, urls) if team_id}
+
+def _fetch_original(team_id):
+    path = _original_path(team_id)
+    if os.path.exists(path):
+        return path
+    failed_at = _failed_at.get(team_id)
+    if failed_at is not None and clock.monotonic() - failed_at < LOGO_FAILURE_RETRY_SECONDS:
+        return None
+
+    url = LOGO_SOURCE_URL.format(team_id=team_id)
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "").startswith("image/"):
+            raise ValueError(f"unexpected content type {response.headers.get('Content-Type')}")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Failed to fetch logo for team %s: %s", team_id, e)
+        _failed_at[team_id] = clock.monotonic()
+        return None
+
+    os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+    _write_atomically(path, response.content)
+    logger.info("Cached logo for team %s (%s bytes).", team_id, len(response.content))
+    return path
+
+def _render_variant(original_path, path, size, image_format):
+    with Image.open(original_path) as image:
+        image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if image_format == "webp":
+            image.save(buffer, "WEBP", quality=90, method=6)
+        else:
+            image.save(buffer, "PNG", optimize=True)
+    _write_atomically(path, buffer.getvalue())
+
+def get_logo(team_id, size=DEFAULT_LOGO_SIZE, accept_webp=False, allowed_team_ids=None):
+    # Returns (file_path, mimetype) for the team's crest, or None if the id is
+    # invalid, not in allowed_team_ids, or the logo cannot be fetched. The CDN
+    # is hit at most once per team; resized variants are rendered once and
+    # then served from disk.
+    if not str(team_id).isdigit():
+        return None
+    if allowed_team_ids is not None and str(team_id) not in allowed_team_ids:
+        return None
+    size = size if size in LOGO_SIZES else DEFAULT_LOGO_SIZE
+
+    with _team_lock(team_id):
+        original_path = _fetch_original(team_id)
+        if original_path is None:
+            return None
+        if Image is None:
+            return original_path, "image/png"
+
+        image_format = "webp" if accept_webp else "png"
+        path = _variant_path(team_id, size, image_format)
+        if not os.path.exists(path):
+            try:
+                _render_variant(original_path, path, size, image_format)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to render %spx %s logo for team %s: %s", size, image_format, team_id, e)
+                return original_path, "image/png"
+        return path, f"image/{image_format}"
@@ -0,0 +1,65 @@
+import os
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget for a whole orchestration tick. Every upstream call made on
+# the tick's thread takes its timeout from what is left, so a tick finishes
+# well before the next one is due however slow the upstreams are.
+TICK_BUDGET_SECONDS = float(os.getenv("TICK_BUDGET_SECONDS", "45"))
+# Low-priority stages (standings, match events, Reddit) only start while at
+# least this much budget is left, keeping room for the commit and scheduling.
+LOW_PRIORITY_RESERVE_SECONDS = float(os.getenv("TICK_LOW_PRIORITY_RESERVE_SECONDS", "15"))
+# No call gets a shorter timeout than this while any budget remains.
+MIN_CALL_TIMEOUT_SECONDS = 1
+
+class Deadline:
+    # Measured on the real monotonic clock, not the replay's virtual clock: it
+    # bounds how long the tick actually runs.
+    def __init__(self, budget_seconds):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+# Context variables are per thread, so threads started from a tick (the Reddit
+# drains, the publisher) keep their own fixed timeouts and never inherit it.
+_current = contextvars.ContextVar("tick_deadline", default=None)
+
+@contextmanager
+def start(budget_seconds=TICK_BUDGET_SECONDS):
+    deadline = Deadline(budget_seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def current():
+    return _current.get()
+
+def expired():
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
+
+def timeout_for(default_seconds):
+    # The call's usual timeout, capped at the tick's remaining budget. Outside
+    # a tick the usual timeout applies unchanged.
+    deadline = _current.get()
+    if deadline is None or default_seconds is None:
+        return default_seconds
+    return max(MIN_CALL_TIMEOUT_SECONDS, min(default_seconds, deadline.remaining()))
+
+def allows_low_priority(stage):
+    deadline = _current.get()
+    if deadline is None or deadline.remaining() >= LOW_PRIORITY_RESERVE_SECONDS:
+        return True
+    logger.warning("Tick budget low (%.1fs of %ss left). Skipping %s.", deadline.remaining(), deadline.budget_seconds, stage)
+    return False
@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const roundInfo = document.getElementById('round-info');
     const lastUpdated = document.getElementById('last-updated');
     const matchesContainer = document.getElementById('matches-container');
+    const standingsContainer = document.getElementById('standings-container');
     const loadingSpinner = document.getElementById('loading-spinner');
     const errorMessage = document.getElementById('error-message');
 
@@ -32,6 +33,44 @@ document.addEventListener('DOMContentLoaded', function() {
         return { date: formattedDate, time: formattedTime };
     }
 
+    // Crests are served by our own logo proxy, keyed on the API-Football team id.
+    const TEAM_LOGO_PATTERN = /\/football\/teams\/(\d+)\.png$/;
+
+    function renderCrest(logoUrl) {
+        const match = logoUrl ? TEAM_LOGO_PATTERN.exec(logoUrl) : null;
+        if (!match) return '';
+        return `<img class="crest" src="/static/logos/${match[1]}?size=32" srcset="/static/logos/${match[1]}?size=64 2x" width="20" height="20" alt="" loading="lazy">`;
+    }
+
+    const EVENT_ICONS = { goal: '⚽', red_card: '🟥', substitution: '🔄' };
+
+    function formatEvent(event) {
+        const minute = event.minute == null ? '' : (event.extra ? `${event.minute}+${event.extra}'` : `${event.minute}'`);
+        let player = event.player || '?';
+        if (event.type === 'substitution' && event.assist) {
+            player = `${event.assist} ↔ ${player}`;
+        } else if (event.detail === 'Own Goal') {
+            player += ' (OG)';
+        } else if (event.detail === 'Penalty') {
+            player += ' (P)';
+        }
+        return `<span class="match-event ${event.type}">${EVENT_ICONS[event.type] || ''} ${player} ${minute}</span>`;
+    }
+
+    function renderMatchEvents(events) {
+        if (!events || events.length === 0) return '';
+        const homeEvents = events.filter(e => e.side === 'home').map(formatEvent).join('');
+        const awayEvents = events.filter(e => e.side === 'away').map(formatEvent).join('');
+        return `
+            <tr class="events-row">
+                <td class="team-home">${homeEvents}</td>
+                <td></td>
+                <td class="team-away">${awayEvents}</td>
+                <td></td>
+            </tr>
+        `;
+    }
+
     function renderTable(data) {
         const competitionName = data.competition_name || 'League';
         const roundId = data.round_id || 'Current Round';
@@ -46,7 +85,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 hour: '2-digit', minute: '2-digit', second: '2-digit', hour12: false, timeZone: grTimezone
             };
             lastUpdated.textContent = `Last Updated: ${updatedDate.toLocaleTimeString('en-GB', options)} (GR)`;
+            if (data.stale) {
+                lastUpdated.textContent += ' — live updates are delayed';
+            }
         }
+        lastUpdated.classList.toggle('stale', Boolean(data.stale));
         
         if (!data.matches || data.matches.length === 0) {
             matchesContainer.innerHTML = '<p>No match data available for this round.</p>';
@@ -91,18 +134,67 @@ document.addEventListener('DOMContentLoaded', function() {
 
             tableBody += `
                 <tr>
-                    <td class="team-home">${homeTeamName}</td>
+                    <td class="team-home">${homeTeamName} ${renderCrest(match.home_team_logo)}</td>
                     <td class="score">${score}</td>
-                    <td class="team-away">${awayTeamName}</td>
+                    <td class="team-away">${renderCrest(match.away_team_logo)} ${awayTeamName}</td>
                     <td class="status-cell">${statusHTML}</td>
                 </tr>
             `;
+            tableBody += renderMatchEvents(match.events);
         });
         tableBody += '</tbody>';
 
         matchesContainer.innerHTML = `<div class="table-container"><table class="match-table">${tableHeader}${tableBody}</table></div>`;
     }
 
+    function renderStandings(standings) {
+        if (!standings || standings.length === 0) {
+            standingsContainer.innerHTML = '';
+            return;
+        }
+
+        // Split and post-season phases come as several groups; label each one.
+        const showGroups = new Set(standings.map(row => row.group)).size > 1;
+        let currentGroup;
+        let tableBody = '<tbody>';
+        standings.forEach(row => {
+            if (showGroups && row.group !== currentGroup) {
+                currentGroup = row.group;
+                tableBody += `<tr class="group-row"><td colspan="5">${row.group || ''}</td></tr>`;
+            }
+            const teamName = row.team_greek || row.team || 'N/A';
+            const goalDifference = row.goal_difference > 0 ? `+${row.goal_difference}` : `${row.goal_difference}`;
+            tableBody += `
+                <tr class="${row.in_play ? 'in-play' : ''}">
+                    <td class="num">${row.rank}</td>
+                    <td>${renderCrest(row.team_logo)} ${teamName}</td>
+                    <td class="num">${row.played}</td>
+                    <td class="num">${goalDifference}</td>
+                    <td class="points">${row.points}</td>
+                </tr>
+            `;
+        });
+        tableBody += '</tbody>';
+
+        standingsContainer.innerHTML = `
+            <h2 class="standings-title">Live Standings</h2>
+            <div class="table-container">
+                <table class="match-table standings-table">
+                    <thead>
+                        <tr>
+                            <th class="num">#</th>
+                            <th>Team</th>
+                            <th class="num">P</th>
+                            <th class="num">GD</th>
+                            <th class="num">Pts</th>
+                        </tr>
+                    </thead>
+                    ${tableBody}
+                </table>
+            </div>
+        `;
+    }
+
     async function fetchData() {
         try {
             const response = await fetch(API_ENDPOINT);
@@ -115,6 +207,7 @@ document.addEventListener('DOMContentLoaded', function() {
             loadingSpinner.classList.add('hidden');
             
             renderTable(data);
+            renderStandings(data.standings);
 
         } catch (error) {
             console.error('Failed to fetch or render data:', error);
@@ -122,6 +215,7 @@ document.addEventListener('DOMContentLoaded', function() {
             errorMessage.textContent = 'Could not load current match data. Please try again later.';
             errorMessage.classList.remove('hidden');
             matchesContainer.innerHTML = '';
+            standingsContainer.innerHTML = '';
         }
     }
 